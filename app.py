@@ -1,5 +1,7 @@
+import os
 import streamlit as st
-from db_functions import init_db, authenticate_user, add_user
+from db_functions import init_db, authenticate_user, add_user, AUTH_BUSY
+from model_loader import start_background_warmup
 
 st.set_page_config(
     page_title="Global Wellness Chatbot", 
@@ -10,6 +12,11 @@ st.set_page_config(
 
 init_db()
 
+# Models load lazily on first use; optionally start loading them in the
+# background so the first chat reply does not pay for it.
+if os.environ.get("WELLBOT_WARMUP", "0") == "1":
+    start_background_warmup()
+
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
 if 'page' not in st.session_state:
@@ -38,7 +45,9 @@ else:
 
                 if submitted:
                     user_id = authenticate_user(email, password)
-                    if user_id:
+                    if user_id == AUTH_BUSY:
+                        st.warning("The server is busy right now. Please try signing in again in a moment.")
+                    elif user_id:
                         st.session_state['logged_in'] = True
                         st.session_state['user_id'] = user_id
                         st.rerun()
@@ -57,7 +66,10 @@ else:
                 submitted = st.form_submit_button("Create Account", use_container_width=True, type="primary")
 
                 if submitted:
-                    if add_user(email, password):
+                    created = add_user(email, password)
+                    if created == AUTH_BUSY:
+                        st.warning("The server is busy right now. Please try again in a moment.")
+                    elif created:
                         st.success("Account created! Please sign in.")
                         st.session_state['page'] = 'login'
                         st.rerun()
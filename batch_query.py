@@ -0,0 +1,180 @@
+"""
+Offline batch mode: answers a JSONL file of queries through the chat
+pipeline without the Streamlit app.
+
+    python batch_query.py queries.jsonl -o answers.jsonl [--batch-size 256]
+    cat queries.jsonl | python batch_query.py - > answers.jsonl
+
+Each input line is an object with a "query" field; any other fields (an
+"id", expected answers) are copied to the output line. The file is read,
+answered and written one batch at a time, so memory is bounded by
+--batch-size however large the file is. Per batch, the non-routed queries
+are encoded in one call and scored against the dataset and the
+knowledge-base sections with one matrix multiply each, and Hindi replies
+go through the segment translation memory, with novel sentences run as
+length-bucketed generate batches (so a run also pre-warms it). The
+response cache is not used; every query is answered from the index.
+
+Output fields: lang, source (greeting, farewell, knowledge_base, dataset
+or fallback), match, score, response and timings_ms, the batch's time per
+stage divided by the batch size.
+"""
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+import numpy as np
+from db_functions import init_db, get_translation, save_translations
+from semantic_engine import encode_texts, find_best_matches, SIMILARITY_THRESHOLD
+from translation_memory import TranslationMemory
+from chatbot_logic import (CONFIG, ROUTER, KNOWLEDGE_BASE, EN_HI_MODEL_VERSION, TRANSLATION_MAX_BATCH,
+                           SEGMENT_TRANSLATION, TRANSLATION_MEMORY, compose_response_en,
+                           compose_kb_response_en, detect_language, text_hash, translate_offline)
+
+
+def read_batches(lines, batch_size):
+    """Yields lists of (line number, parsed record or error message)."""
+    numbered = enumerate(lines, start=1)
+    while True:
+        batch, seen = [], 0
+        for number, line in islice(numbered, batch_size):
+            seen += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict) or not isinstance(record.get("query"), str):
+                    raise ValueError('expected an object with a string "query" field')
+                batch.append((number, record))
+            except ValueError as e:
+                batch.append((number, f"Invalid input line: {e}"))
+        if not seen:
+            return
+        if batch:
+            yield batch
+
+
+def translate_responses(texts, memory, batch_size):
+    """Hindi for each English text, through the translation memory or the translations table."""
+    if SEGMENT_TRANSLATION:
+        return memory.translate_texts(texts)
+    unique = list(dict.fromkeys(texts))
+    hashes = {text: text_hash(text) for text in unique}
+    translated = {text: get_translation(hashes[text], EN_HI_MODEL_VERSION) for text in unique}
+    missing = [text for text in unique if translated[text] is None]
+    if missing:
+        outputs = translate_offline(missing, batch_size)
+        save_translations([(hashes[src], EN_HI_MODEL_VERSION, src, dst) for src, dst in zip(missing, outputs)])
+        translated.update(zip(missing, outputs))
+    return [translated[text] for text in texts]
+
+
+def answer_batch(records, memory, translate_batch_size):
+    """Fills lang, source, match, score and response into each record; returns stage seconds."""
+    timings = {"route": 0.0, "encode": 0.0, "search": 0.0, "translate": 0.0}
+    kb = KNOWLEDGE_BASE.get()
+
+    start = time.perf_counter()
+    pending = []
+    for record in records:
+        record["lang"] = detect_language(record["query"])
+        route = ROUTER.route(record["query"], kb)
+        response_en = None
+        if route is not None and route.intent in ("greeting", "farewell"):
+            record.update(source=route.intent, match=None, score=None,
+                          response=CONFIG["responses"][f"{route.intent}_{record['lang']}"])
+            continue
+        if route is not None:
+            response_en = compose_kb_response_en(route.condition, route.section, kb)
+        if response_en is None:
+            pending.append(record)
+        else:
+            record.update(source="knowledge_base", match=f"{route.condition}/{route.section or 'overview'}",
+                          score=None, response_en=response_en)
+    timings["route"] = time.perf_counter() - start
+
+    if pending:
+        start = time.perf_counter()
+        queries = [record["query"] for record in pending]
+        query_vecs = encode_texts(queries)
+        timings["encode"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = find_best_matches(query_vecs, queries)
+        kb_scores = kb.section_embeddings(encode_texts) @ query_vecs.T
+        kb_best = kb_scores.argmax(axis=0)
+        timings["search"] = time.perf_counter() - start
+
+        for i, (record, (row, score)) in enumerate(zip(pending, matches)):
+            kb_score = float(kb_scores[kb_best[i], i])
+            if kb_score >= SIMILARITY_THRESHOLD and kb_score > score:
+                condition, section = kb.sections[kb_best[i]]
+                record.update(source="knowledge_base", match=f"{condition}/{section}", score=round(kb_score, 4),
+                              response_en=compose_kb_response_en(condition, section, kb))
+            else:
+                record.update(source="dataset" if row is not None else "fallback",
+                              match=row['question'] if row is not None else None, score=round(score, 4),
+                              response_en=compose_response_en(row))
+
+    start = time.perf_counter()
+    answered = [record for record in records if "response_en" in record]
+    hindi = [record for record in answered if record["lang"] == "hi"]
+    if hindi:
+        for record, text in zip(hindi, translate_responses([r["response_en"] for r in hindi], memory, translate_batch_size)):
+            record["response"] = text
+    for record in answered:
+        record.setdefault("response", record["response_en"])
+        del record["response_en"]
+    timings["translate"] = time.perf_counter() - start
+    return timings
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of queries through the chat pipeline.")
+    parser.add_argument("input", help="JSONL file with one {\"query\": ...} object per line, or - for stdin.")
+    parser.add_argument("-o", "--output", help="Output JSONL file (default stdout).")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--translate-batch-size", type=int, default=TRANSLATION_MAX_BATCH)
+    args = parser.parse_args()
+
+    init_db()
+    # Same memory as the chat path, but misses run as offline generate batches.
+    memory = TranslationMemory(EN_HI_MODEL_VERSION, lambda texts: translate_offline(texts, args.translate_batch_size),
+                               TRANSLATION_MEMORY.reference)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding='utf-8')
+    sink = sys.stdout if not args.output else open(args.output, "w", encoding='utf-8')
+    total, failed, started = 0, 0, time.perf_counter()
+    try:
+        for batch in read_batches(source, args.batch_size):
+            records = [record for _, record in batch if isinstance(record, dict)]
+            timings = answer_batch(records, memory, args.translate_batch_size) if records else {}
+            per_row = {stage: round(seconds * 1000 / len(records), 3) for stage, seconds in timings.items()}
+            for number, record in batch:
+                if isinstance(record, dict):
+                    record["timings_ms"] = per_row
+                else:
+                    record = {"line": number, "error": record}
+                    failed += 1
+                sink.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+            sink.flush()
+            total += len(batch)
+            print(f"  {total} queries ({total / (time.perf_counter() - started):.1f}/s)", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(f"Answered {total - failed} queries, {failed} invalid lines.", file=sys.stderr)
+    if SEGMENT_TRANSLATION:
+        print(f"Translation memory: {json.dumps(memory.report())}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Recall and latency of the approximate (IVF) search backend against the exact one.
+
+    python benchmarks/ann_recall.py --rows 1000000 --dim 384 --queries 200
+
+Uses a synthetic clustered corpus so it runs without the dataset or the model.
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from semantic_engine import ExactIndex, IVFIndex, evaluate_index
+
+
+def synthetic_corpus(rows, dim, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    data = centers[rng.integers(0, clusters, rows)] + 0.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, default=8)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.rows, args.dim, clusters=max(16, args.rows // 1000))
+    queries = corpus[np.random.default_rng(1).choice(args.rows, args.queries, replace=False)]
+    queries = queries + 0.1 * np.random.default_rng(2).standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact = ExactIndex(corpus)
+    start = time.perf_counter()
+    ivf = IVFIndex(corpus, n_probe=args.n_probe)
+    build_s = time.perf_counter() - start
+
+    report = evaluate_index(ivf, exact, queries, k=args.k)
+    report.update({"rows": args.rows, "dim": args.dim, "n_lists": len(ivf.lists),
+                   "n_probe": args.n_probe, "build_s": round(build_s, 3)})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Login load test for the bcrypt worker pool.
+
+    python benchmarks/auth_load.py --clients 32 --logins 256 --rounds 12
+
+Creates throwaway users in a temporary database, then fires concurrent
+authenticate_user calls and reports logins/s, tail latency and how many
+attempts were shed with AUTH_BUSY.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import importlib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=256)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--max-pending", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["WELLBOT_DB_PATH"] = os.path.join(tmp, "auth.sqlite")
+        os.environ["WELLBOT_BCRYPT_ROUNDS"] = str(args.rounds)
+        os.environ["WELLBOT_AUTH_MAX_PENDING"] = str(args.max_pending)
+        db = importlib.import_module("db_functions")
+        db.init_db()
+        for i in range(args.users):
+            db.add_user(f"user{i}@example.com", "correct horse")
+
+        latencies, outcomes = [], {"ok": 0, "busy": 0, "failed": 0}
+        lock = threading.Lock()
+
+        def client(worker_id):
+            for i in range(worker_id, args.logins, args.clients):
+                start = time.perf_counter()
+                result = db.authenticate_user(f"user{i % args.users}@example.com", "correct horse")
+                elapsed = time.perf_counter() - start
+                key = "busy" if result == db.AUTH_BUSY else ("ok" if result else "failed")
+                with lock:
+                    outcomes[key] += 1
+                    if key == "ok":
+                        latencies.append(elapsed)
+
+        threads = [threading.Thread(target=client, args=(w,)) for w in range(args.clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+
+    report = {
+        "clients": args.clients,
+        "rounds": args.rounds,
+        "auth_workers": db.AUTH_WORKERS,
+        "logins_per_s": round(outcomes["ok"] / wall, 1),
+        "outcomes": outcomes,
+    }
+    if latencies:
+        report.update({
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)) * 1000, 1),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)) * 1000, 1),
+            "latency_ms_p99": round(float(np.percentile(latencies, 99)) * 1000, 1),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Concurrent profile read/write benchmark: pooled WAL connections versus the
+previous connect-per-call access with the default rollback journal.
+"pooled_wal" runs with the in-process profile cache disabled, so it measures
+the connection pool alone; "pooled_wal_cached" adds the cache on top.
+
+    python benchmarks/db_concurrency.py --threads 16 --ops 2000 --write-ratio 0.1
+
+Runs against throwaway databases in a temporary directory.
+"""
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import importlib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USERS = 200
+
+
+def legacy_ops(path):
+    def get_profile(user_id):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        c = conn.cursor()
+        c.execute("SELECT name, age, language FROM profiles WHERE user_id = ?", (user_id,))
+        profile = c.fetchone()
+        conn.close()
+        return profile
+
+    def update_profile(user_id, name, age, language):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        c = conn.cursor()
+        c.execute("UPDATE profiles SET name = ?, age = ?, language = ? WHERE user_id = ?", (name, age, language, user_id))
+        conn.commit()
+        conn.close()
+
+    return get_profile, update_profile
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL, password TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS profiles (user_id INTEGER PRIMARY KEY, name TEXT, age INTEGER, language TEXT)")
+    conn.executemany("INSERT INTO profiles (user_id, name, age, language) VALUES (?, ?, ?, ?)",
+                     [(i, f"user{i}", 30, "English") for i in range(1, USERS + 1)])
+    conn.commit()
+    conn.close()
+
+
+def run(get_profile, update_profile, threads, ops, write_ratio):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        local = []
+        for _ in range(ops // threads):
+            user_id = rng.randint(1, USERS)
+            start = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    update_profile(user_id, f"user{user_id}", rng.randint(18, 90), "Hindi")
+                else:
+                    get_profile(user_id)
+            except sqlite3.OperationalError:
+                with lock:
+                    errors[0] += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "ops_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)) * 1000, 3),
+        "locked_errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.sqlite")
+        pooled_path = os.path.join(tmp, "pooled.sqlite")
+        seed(legacy_path)
+        seed(pooled_path)
+
+        os.environ["WELLBOT_DB_PATH"] = pooled_path
+        db_functions = importlib.import_module("db_functions")
+        db_functions.init_db()
+
+        report = {
+            "threads": args.threads,
+            "ops": args.ops,
+            "write_ratio": args.write_ratio,
+            "legacy": run(*legacy_ops(legacy_path), args.threads, args.ops, args.write_ratio),
+        }
+        cache_size = db_functions.PROFILE_CACHE_SIZE
+        for name, size in (("pooled_wal", 0), ("pooled_wal_cached", cache_size)):
+            db_functions.PROFILE_CACHE_SIZE = size
+            db_functions._profile_cache.clear()
+            report[name] = run(db_functions.get_profile, db_functions.update_profile,
+                               args.threads, args.ops, args.write_ratio)
+        db_functions.PROFILE_CACHE_SIZE = cache_size
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
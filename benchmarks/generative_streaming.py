@@ -0,0 +1,62 @@
+"""
+Time-to-first-token of generate_response_stream versus the blocking
+generate_response, plus a warm answer-cache hit, using the offline fake backend.
+
+    python benchmarks/generative_streaming.py --first-chunk-delay 0.8 --chunk-delay 0.1 --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fake_genai import FakeGenerativeModel
+import generative_ai
+from generative_ai import AnswerCache, generate_response, generate_response_stream
+
+CONTEXT = "Rest in a quiet, dark room, stay hydrated, and apply a cold pack to your forehead."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--first-chunk-delay", type=float, default=0.5)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    model = FakeGenerativeModel(first_chunk_delay=args.first_chunk_delay, chunk_delay=args.chunk_delay)
+    # Measure generation itself; a warm answer cache would serve every run after the first.
+    generative_ai.ANSWER_CACHE = AnswerCache(max_entries=0, cache_dir="")
+    blocking, ttft, total = [], [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        generate_response(CONTEXT, "headache", model=model)
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first = None
+        for _chunk in generate_response_stream(CONTEXT, "headache", model=model):
+            if first is None:
+                first = time.perf_counter() - start
+        ttft.append(first)
+        total.append(time.perf_counter() - start)
+
+    generative_ai.ANSWER_CACHE = AnswerCache(cache_dir="")
+    generate_response(CONTEXT, "headache", model=model)
+    start = time.perf_counter()
+    generate_response(CONTEXT, "headache", model=model)
+    cached = [time.perf_counter() - start]
+
+    mean = lambda xs: round(sum(xs) / len(xs) * 1000, 1)
+    print(json.dumps({
+        "runs": args.runs,
+        "blocking_ms": mean(blocking),
+        "stream_ttft_ms": mean(ttft),
+        "stream_total_ms": mean(total),
+        "cached_ms": mean(cached),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Memory and throughput of N chat worker processes, each loading its own
+models versus all of them sharing one inference_server.py process.
+
+    python benchmarks/inference_workers.py [--workers 1 4 8] [--repeat 20]
+
+RSS is read from /proc/<pid>/status (VmRSS), so this needs Linux.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing as mp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from model_loader import current_rss_mb
+
+QUERIES = [
+    "what should I do for a fever", "how to treat a burn", "symptoms of the common cold",
+    "my head hurts a lot", "how to stop a nose bleed", "what helps with a sore throat",
+    "how much water should I drink every day", "is it safe to exercise with a sprained ankle",
+]
+
+
+def _worker(address, repeat, barrier, results):
+    # Must be set before semantic_engine is imported: client mode is decided at import time.
+    os.environ["WELLBOT_INFERENCE_ADDR"] = address
+    os.chdir(ROOT)
+    from semantic_engine import find_best_match
+    find_best_match(QUERIES[0])  # load models / open the connection outside the timed loop
+    barrier.wait()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            find_best_match(query)
+    elapsed = time.perf_counter() - start
+    results.put({"rss_mb": current_rss_mb(), "queries": repeat * len(QUERIES), "seconds": elapsed})
+
+
+def _wait_for_server(address, proc, timeout=300):
+    from inference_client import InferenceClient, InferenceUnavailable
+    client = InferenceClient(address)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("inference_server.py exited during startup")
+        try:
+            client.call("info")
+            return
+        except InferenceUnavailable:
+            time.sleep(0.2)
+    raise RuntimeError("inference_server.py did not start in time")
+
+
+def _proc_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run(n_workers, address, repeat):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(address, repeat, barrier, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    start = time.perf_counter()
+    reports = [results.get() for _ in procs]
+    wall = time.perf_counter() - start
+    for p in procs:
+        p.join()
+    total_queries = sum(r["queries"] for r in reports)
+    return {
+        "workers": n_workers,
+        "worker_rss_mb": round(sum(r["rss_mb"] for r in reports) / n_workers, 1),
+        "total_worker_rss_mb": round(sum(r["rss_mb"] for r in reports), 1),
+        "queries_per_second": round(total_queries / wall, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report = {"in_process": [], "shared_server": []}
+    for n in args.workers:
+        report["in_process"].append(run(n, "", args.repeat))
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    address = f"unix:{socket_path}"
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "inference_server.py"), "--socket", socket_path], cwd=ROOT)
+    try:
+        _wait_for_server(address, server)
+        for n in args.workers:
+            result = run(n, address, args.repeat)
+            result["server_rss_mb"] = round(_proc_rss_mb(server.pid), 1)
+            result["total_rss_mb"] = round(result["total_worker_rss_mb"] + result["server_rss_mb"], 1)
+            report["shared_server"].append(result)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Recall@1 and per-query CPU of the BM25 prefilter + re-rank (HybridIndex)
+against the exhaustive ExactIndex search used by find_best_match.
+
+    python benchmarks/lexical_prefilter.py --stub --rows 200000
+    python benchmarks/lexical_prefilter.py --rows 20000 --candidates 300
+
+The corpus is the dataset questions padded with synthetic questions up to
+--rows. Queries are paraphrases of corpus questions (words dropped, filler
+added) mixed with the English/Hindi chat workload of benchmarks/pipeline.py.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+FILLER = ["please", "tell me", "quickly", "for my child", "at home", "today"]
+
+
+def synthetic_questions(n, seed=0):
+    """Template questions about the KB conditions plus Zipf-distributed rare terms."""
+    from pipeline import QUESTION_TEMPLATES
+    with open(os.path.join(ROOT, "knowledge_base.json"), encoding='utf-8') as f:
+        conditions = sorted(json.load(f)["conditions"])
+    rng = np.random.default_rng(seed)
+    vocab_size = max(1000, n // 4)
+    words = rng.zipf(1.1, size=(n, 4)) % vocab_size
+    return [
+        f"{QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)].format(c=conditions[i % len(conditions)])} "
+        + " ".join(f"term{w}" for w in words[i])
+        for i in range(n)
+    ]
+
+
+def paraphrase(question, rng):
+    words = question.split()
+    if len(words) > 3:
+        del words[rng.randrange(len(words))]
+    words.insert(rng.randrange(len(words) + 1), rng.choice(FILLER))
+    return " ".join(words)
+
+
+def latency_summary(latencies):
+    ms = np.asarray(latencies) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "mean_ms": round(float(ms.mean()), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stub", action="store_true", help="Use stub models (offline, CPU only).")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    if args.stub:
+        import stub_models
+        stub_models.install()
+    import semantic_engine
+    from semantic_engine import ExactIndex, HybridIndex, encode_texts, SIMILARITY_THRESHOLD
+    from pipeline import make_workload
+
+    df = semantic_engine.load_dataset() if os.path.exists(semantic_engine.DATASET_PATH) else None
+    questions = df['question'].astype(str).tolist() if df is not None else []
+    questions += synthetic_questions(max(0, args.rows - len(questions)), args.seed)
+
+    start = time.perf_counter()
+    embeddings = np.concatenate([encode_texts(questions[i:i + 1024]) for i in range(0, len(questions), 1024)])
+    encode_s = time.perf_counter() - start
+
+    exact = ExactIndex(embeddings)
+    start = time.perf_counter()
+    hybrid = HybridIndex(embeddings, questions, exact, candidates=args.candidates)
+    bm25_build_s = time.perf_counter() - start
+
+    rng = random.Random(args.seed)
+    n_chat = args.queries // 3
+    queries = [paraphrase(rng.choice(questions), rng) for _ in range(args.queries - n_chat)]
+    queries += make_workload(n_chat, 0.3, args.seed)
+    query_vecs = encode_texts(queries)
+
+    agree, same_row, answered_agree, prefiltered = 0, 0, 0, 0
+    exact_latencies, hybrid_latencies, score_loss = [], [], []
+    for query, vec in zip(queries, query_vecs):
+        t0 = time.perf_counter()
+        ref, ref_scores = exact.search(vec, 1)
+        t1 = time.perf_counter()
+        found, scores = hybrid.search_text(query, vec, 1)
+        t2 = time.perf_counter()
+        exact_latencies.append(t1 - t0)
+        hybrid_latencies.append(t2 - t1)
+        # Rows with the same score as the exhaustive best are equally correct answers.
+        same = int(found[0]) == int(ref[0]) or scores[0] >= ref_scores[0] - 1e-6
+        same_row += int(found[0]) == int(ref[0])
+        score_loss.append(max(0.0, float(ref_scores[0] - scores[0])))
+        agree += same
+        # What the user sees: the same row, or both below the threshold (fallback reply).
+        answered_agree += same or (scores[0] < SIMILARITY_THRESHOLD and ref_scores[0] < SIMILARITY_THRESHOLD)
+        # Served from the lexical candidates, without the dense fallback.
+        rows, _ = hybrid.lexical.top(query, hybrid.candidates)
+        prefiltered += bool(len(rows)) and float((embeddings[rows] @ vec).max()) >= SIMILARITY_THRESHOLD
+
+    hindi = sum(1 for q in queries if any(ord(c) > 127 for c in q))
+    print(json.dumps({
+        "rows": len(questions),
+        "queries": len(queries),
+        "hindi_queries": hindi,
+        "candidates": args.candidates,
+        "vocabulary": len(hybrid.lexical.vocab),
+        "encode_corpus_s": round(encode_s, 2),
+        "bm25_build_s": round(bm25_build_s, 2),
+        "recall_at_1": round(agree / len(queries), 4),
+        "same_row_fraction": round(same_row / len(queries), 4),
+        "mean_score_loss": round(float(np.mean(score_loss)), 4),
+        "max_score_loss": round(float(np.max(score_loss)), 4),
+        "answer_agreement": round(answered_agree / len(queries), 4),
+        "prefiltered_fraction": round(prefiltered / len(queries), 4),
+        "exhaustive": latency_summary(exact_latencies),
+        "hybrid": latency_summary(hybrid_latencies),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+End-to-end latency benchmark for the chat pipeline: get_bot_response and its
+stages (router, encode_query, find_best_match, knowledge-base search,
+translation, extract_health_entities) plus the db_functions calls a chat
+turn makes, driven by a synthetic English/Hindi workload.
+
+    python benchmarks/pipeline.py --stub                  # offline, stub models
+    python benchmarks/pipeline.py --queries 1000 --hindi-ratio 0.5
+    python benchmarks/pipeline.py --stub --baseline benchmarks/results/pipeline-abc1234.json
+
+Reports p50/p95/p99 latency and throughput per stage, current and peak RSS,
+and cold versus warm startup (a fresh process without and with the embedding
+index on disk). Everything runs in a temporary working directory with its own
+database and index; results are written as JSON to --output (by default
+benchmarks/results/pipeline-<commit>.json) for comparison across commits.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EN_TEMPLATES = [
+    "{c}", "first aid for {c}", "symptoms of {c}", "how to prevent {c}", "what is {c}",
+    "how do I treat {c} at home", "I think I have {c}, what should I do",
+    "is {c} dangerous for children", "what should I eat when I have {c}",
+    "can {c} come back after a week",
+]
+HI_TEMPLATES = [
+    "{c}", "मुझे {c} है", "{c} का इलाज", "{c} के लक्षण", "{c} से कैसे बचें",
+    "{c} में क्या खाना चाहिए", "बच्चे को {c} हो तो क्या करें", "{c} कितने दिन रहता है",
+]
+OFF_TOPIC = [
+    "how much water should I drink every day", "is it safe to exercise after eating",
+    "how many hours of sleep do adults need", "what is a balanced diet",
+    "रोज़ कितना पानी पीना चाहिए", "अच्छी नींद के लिए क्या करें",
+]
+QUESTION_TEMPLATES = [
+    "How to treat {c}", "What are the symptoms of {c}", "How can I prevent {c}",
+    "What is {c}", "When should I see a doctor for {c}", "What causes {c}",
+]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def write_synthetic_dataset(path, kb, rows):
+    """CSV in the health_dataset.csv layout, built from the knowledge-base conditions."""
+    import pandas as pd
+    records = []
+    names = sorted(kb["conditions"])
+    for i in range(rows):
+        name = names[i % len(names)]
+        entry = kb["conditions"][name]
+        template = QUESTION_TEMPLATES[(i // len(names)) % len(QUESTION_TEMPLATES)]
+        question = template.format(c=name)
+        if i >= len(names) * len(QUESTION_TEMPLATES):
+            question += f" (variant {i})"
+        records.append({"question": question, "answer": entry["first_aid"], "source": "synthetic"})
+    pd.DataFrame(records).to_csv(path, index=False)
+
+
+def prepare_workdir(workdir, dataset, dataset_rows):
+    shutil.copy(os.path.join(ROOT, "knowledge_base.json"), workdir)
+    target = os.path.join(workdir, "health_dataset.csv")
+    if dataset:
+        shutil.copy(dataset, target)
+    else:
+        with open(os.path.join(ROOT, "knowledge_base.json"), encoding='utf-8') as f:
+            write_synthetic_dataset(target, json.load(f), dataset_rows)
+
+
+def make_workload(n, hindi_ratio, seed):
+    from nlu_engine import HEALTH_KEYWORDS_HI
+    with open(os.path.join(ROOT, "knowledge_base.json"), encoding='utf-8') as f:
+        conditions = sorted(json.load(f)["conditions"])
+    hindi_conditions = sorted(HEALTH_KEYWORDS_HI)
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            workload.append(rng.choice(OFF_TOPIC))
+        elif rng.random() < hindi_ratio:
+            workload.append(rng.choice(HI_TEMPLATES).format(c=rng.choice(hindi_conditions)))
+        else:
+            workload.append(rng.choice(EN_TEMPLATES).format(c=rng.choice(conditions)))
+    return workload
+
+
+def _enter_workdir(workdir, stub):
+    """Points the app at workdir; must run before any repo module is imported."""
+    os.chdir(workdir)
+    os.environ["WELLBOT_DB_PATH"] = os.path.join(workdir, "healthbot.sqlite")
+    os.environ["WELLBOT_INFERENCE_ADDR"] = ""
+    os.environ.setdefault("WELLBOT_BCRYPT_ROUNDS", "4")
+    sys.path.insert(0, ROOT)
+    import db_functions
+    db_functions.init_db()
+    if stub:
+        sys.path.insert(0, BENCH_DIR)
+        import stub_models
+        stub_models.install()
+
+
+def summarize(latencies, elapsed):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "n": len(latencies),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def time_stage(fn, inputs):
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def probe(args):
+    """Runs in a fresh process: import time, first reply and second reply."""
+    t0 = time.perf_counter()
+    _enter_workdir(args.workdir, args.stub)
+    import chatbot_logic
+    imported = time.perf_counter()
+    chatbot_logic.get_bot_response("what should I eat when I have a fever and a cough")
+    first = time.perf_counter()
+    chatbot_logic.get_bot_response("मुझे रात में खांसी क्यों आती है")
+    second = time.perf_counter()
+    print(json.dumps({
+        "import_s": round(imported - t0, 3),
+        "first_response_s": round(first - imported, 3),
+        "second_response_s": round(second - first, 3),
+        "time_to_first_response_s": round(first - t0, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }))
+
+
+def run_probe(workdir, stub):
+    cmd = [sys.executable, os.path.abspath(__file__), "--probe", "--workdir", workdir]
+    if stub:
+        cmd.append("--stub")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise RuntimeError("Startup probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_stages(workload, db_ops):
+    import chatbot_logic
+    import db_functions
+    from semantic_engine import encode_query, encode_texts, find_best_match
+    from nlu_engine import extract_health_entities
+
+    stages = {}
+    stages["router"] = time_stage(chatbot_logic.ROUTER.route, workload)
+    stages["extract_health_entities"] = time_stage(extract_health_entities, workload)
+    stages["encode_query"] = time_stage(encode_query, workload)
+    embeddings = {query: encode_query(query) for query in set(workload)}
+    stages["find_best_match"] = time_stage(lambda q: find_best_match(q, embeddings[q]), workload)
+    kb = chatbot_logic.KNOWLEDGE_BASE.get()
+    stages["kb_search"] = time_stage(lambda q: kb.search(embeddings[q], encode_texts), workload)
+
+    responses = [chatbot_logic.compose_response_en(find_best_match(q, embeddings[q])[0]) for q in workload[:db_ops]]
+    model, tokenizer = chatbot_logic.get_translation_model("en_hi")
+    stages["translate"] = time_stage(lambda text: chatbot_logic.translate(text, model, tokenizer), responses)
+    stages["translate_to_hindi"] = time_stage(chatbot_logic.translate_to_hindi, responses)
+
+    # Cold cache: every query is new to the response cache.
+    stages["get_bot_response_cold"] = time_stage(chatbot_logic.get_bot_response, list(dict.fromkeys(workload)))
+    stages["get_bot_response"] = time_stage(chatbot_logic.get_bot_response, workload)
+
+    db_functions.add_user("bench@example.com", "bench-password")
+    with db_functions.get_connection() as conn:
+        user_id = conn.execute("SELECT id FROM users WHERE email = ?", ("bench@example.com",)).fetchone()[0]
+    turns = list(range(db_ops))
+    stages["db_update_profile"] = time_stage(lambda i: db_functions.update_profile(user_id, f"user{i}", 30, "English"), turns)
+    stages["db_get_profile"] = time_stage(lambda i: db_functions.get_profile(user_id), turns)
+    stages["db_add_messages"] = time_stage(
+        lambda i: db_functions.add_messages(user_id, [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]),
+        turns)
+    stages["db_get_messages"] = time_stage(lambda i: db_functions.get_messages(user_id, 30), turns)
+    stages["db_get_translation"] = time_stage(
+        lambda text: db_functions.get_translation(chatbot_logic.text_hash(text), chatbot_logic.EN_HI_MODEL_VERSION), responses)
+
+    return stages, chatbot_logic.get_response_cache().stats()
+
+
+def compare(report, baseline_path):
+    """p95 ratio (current / baseline) per stage; above 1.0 is slower."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    return {
+        stage: round(result["p95_ms"] / baseline["stages"][stage]["p95_ms"], 3)
+        for stage, result in report["stages"].items()
+        if stage in baseline.get("stages", {}) and baseline["stages"][stage]["p95_ms"] > 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stub", action="store_true", help="Use stub models (offline, CPU only).")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--hindi-ratio", type=float, default=0.3)
+    parser.add_argument("--db-ops", type=int, default=200)
+    parser.add_argument("--dataset", help="CSV to serve instead of a synthetic one.")
+    parser.add_argument("--dataset-rows", type=int, default=2000, help="Rows in the synthetic dataset.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-startup", action="store_true")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/pipeline-<commit>.json).")
+    parser.add_argument("--baseline", help="Earlier results file to compare p95 latencies against.")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args)
+        return
+
+    commit = _git_commit()
+    output = os.path.abspath(args.output or os.path.join(BENCH_DIR, "results", f"pipeline-{commit}.json"))
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    dataset = os.path.abspath(args.dataset) if args.dataset else None
+    workdir = tempfile.mkdtemp(prefix="wellbot-bench-")
+    try:
+        prepare_workdir(workdir, dataset, args.dataset_rows)
+        startup = {}
+        if not args.skip_startup:
+            # No index on disk yet, then the same process start with the index cached.
+            startup["cold"] = run_probe(workdir, args.stub)
+            startup["warm"] = run_probe(workdir, args.stub)
+
+        _enter_workdir(workdir, args.stub)
+        from model_loader import current_rss_mb, startup_report
+        workload = make_workload(args.queries, args.hindi_ratio, args.seed)
+        stages, cache_stats = run_stages(workload, args.db_ops)
+        report = {
+            "meta": {
+                "commit": commit,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "stub_models": args.stub,
+                "queries": args.queries,
+                "hindi_ratio": args.hindi_ratio,
+                "seed": args.seed,
+            },
+            "startup": startup,
+            "stages": stages,
+            "response_cache": cache_stats,
+            "models": startup_report(),
+            "rss_mb": round(current_rss_mb(), 1),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+        if baseline:
+            report["p95_vs_baseline"] = compare(report, baseline)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Accuracy versus speed of the quantized CPU inference modes.
+
+    python benchmarks/quantization.py                  # index, embedding and translation models
+    python benchmarks/quantization.py --skip-models    # compact index only (no downloads)
+
+Index: float16 and int8 CompactIndex against the float32 ExactIndex on the
+dataset embeddings (or a synthetic corpus) - top-1 agreement, recall@10,
+latency and resident matrix size. Models: WELLBOT_QUANTIZE=int8 against full
+precision - top-1 match agreement of the SentenceTransformer over the dataset
+questions, and chrF of the int8 Marian output with the float32 output as
+reference. Each check is compared with a stated tolerance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+from semantic_engine import ExactIndex, CompactIndex, evaluate_index
+from model_loader import current_rss_mb
+from ann_recall import synthetic_corpus
+from pipeline import make_workload
+
+
+def chrf(hypothesis, reference, max_n=6, beta=2.0):
+    """Character n-gram F-score (chrF), 0..1; 1.0 means identical n-gram profiles."""
+    hypothesis, reference = hypothesis.replace(" ", ""), reference.replace(" ", "")
+    precisions, recalls = [], []
+    for n in range(1, max_n + 1):
+        hyp = Counter(hypothesis[i:i + n] for i in range(len(hypothesis) - n + 1))
+        ref = Counter(reference[i:i + n] for i in range(len(reference) - n + 1))
+        if not hyp or not ref:
+            continue
+        overlap = sum((hyp & ref).values())
+        precisions.append(overlap / sum(hyp.values()))
+        recalls.append(overlap / sum(ref.values()))
+    if not precisions:
+        return 1.0 if hypothesis == reference else 0.0
+    p, r = np.mean(precisions), np.mean(recalls)
+    if p == 0 and r == 0:
+        return 0.0
+    return float((1 + beta ** 2) * p * r / (beta ** 2 * p + r))
+
+
+def timed_ms(fn, items):
+    latencies, results = [], []
+    for item in items:
+        start = time.perf_counter()
+        results.append(fn(item))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, {"p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                     "p95_ms": round(float(np.percentile(latencies, 95)), 2)}
+
+
+def index_report(embeddings, queries, min_top1):
+    exact = ExactIndex(embeddings)
+    report = {"rows": int(embeddings.shape[0]), "float32_mb": round(embeddings.nbytes / 2**20, 1)}
+    for dtype in ("float16", "int8"):
+        index = CompactIndex(embeddings, dtype)
+        top1 = np.mean([index.search(q, 1)[0][0] == exact.search(q, 1)[0][0] for q in queries])
+        result = evaluate_index(index, exact, queries, k=10)
+        report[dtype] = {
+            "top1_agreement": round(float(top1), 4),
+            "recall_at_10": round(result["recall_at_k"], 4),
+            "latency_ms_p50": round(result["latency_ms_p50"], 3),
+            "float32_latency_ms_p50": round(result["reference_latency_ms_p50"], 3),
+            "resident_mb": round((index.compact.nbytes + (index.scales.nbytes if index.scales is not None else 0)) / 2**20, 1),
+            "within_tolerance": bool(top1 >= min_top1),
+        }
+    return report
+
+
+def embedding_report(questions, queries, min_top1):
+    from semantic_engine import _load_sentence_transformer
+    report = {}
+    vectors = {}
+    for mode in ("", "int8"):
+        rss = current_rss_mb()
+        start = time.perf_counter()
+        model = _load_sentence_transformer(mode)
+        load_s = time.perf_counter() - start
+        encode = lambda texts: model.encode(texts, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+        corpus = np.concatenate([encode(questions[i:i + 256]) for i in range(0, len(questions), 256)])
+        query_vecs, latency = timed_ms(lambda q: encode([q])[0], queries)
+        vectors[mode or "float32"] = (corpus, np.asarray(query_vecs))
+        report[mode or "float32"] = dict(latency, load_s=round(load_s, 2), rss_delta_mb=round(current_rss_mb() - rss, 1))
+        del model
+
+    # Production keeps one index, so compare int8 queries against the float32 corpus.
+    corpus, reference = vectors["float32"]
+    quantized = vectors["int8"][1]
+    exact = ExactIndex(corpus)
+    top1 = np.mean([exact.search(a, 1)[0][0] == exact.search(b, 1)[0][0] for a, b in zip(reference, quantized)])
+    report["query_cosine_mean"] = round(float(np.mean(np.sum(reference * quantized, axis=1))), 4)
+    report["top1_agreement"] = round(float(top1), 4)
+    report["within_tolerance"] = bool(top1 >= min_top1)
+    return report
+
+
+def translation_report(texts, min_chrf):
+    from chatbot_logic import _load_marian, EN_HI_MODEL_NAME, translate
+    outputs, report = {}, {}
+    for mode in ("", "int8"):
+        rss = current_rss_mb()
+        model, tokenizer = _load_marian(EN_HI_MODEL_NAME, mode)
+        outputs[mode or "float32"], latency = timed_ms(lambda t: translate(t, model, tokenizer), texts)
+        report[mode or "float32"] = dict(latency, rss_delta_mb=round(current_rss_mb() - rss, 1))
+        del model
+    scores = [chrf(hyp, ref) for hyp, ref in zip(outputs["int8"], outputs["float32"])]
+    report["chrf_mean"] = round(float(np.mean(scores)), 4)
+    report["chrf_min"] = round(float(np.min(scores)), 4)
+    report["identical_fraction"] = round(float(np.mean([a == b for a, b in zip(outputs["int8"], outputs["float32"])])), 4)
+    report["within_tolerance"] = bool(report["chrf_mean"] >= min_chrf)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic corpus size when no index is built.")
+    parser.add_argument("--min-top1", type=float, default=0.98, help="Tolerance for top-1 match agreement.")
+    parser.add_argument("--min-chrf", type=float, default=0.90, help="Tolerance for mean chrF against float32 output.")
+    parser.add_argument("--skip-models", action="store_true")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    import semantic_engine
+    df = semantic_engine.load_dataset() if os.path.exists(semantic_engine.DATASET_PATH) else None
+    rng = np.random.default_rng(0)
+    if df is not None and not args.skip_models:
+        embeddings = semantic_engine.get_dataset_index().embeddings
+    else:
+        embeddings = synthetic_corpus(args.rows, 384, clusters=max(16, args.rows // 1000))
+    sample = embeddings[rng.choice(embeddings.shape[0], min(args.queries, embeddings.shape[0]), replace=False)]
+    sample = sample + 0.1 * rng.standard_normal(sample.shape).astype(np.float32)
+    sample /= np.linalg.norm(sample, axis=1, keepdims=True)
+
+    report = {"tolerances": {"min_top1": args.min_top1, "min_chrf": args.min_chrf},
+              "index": index_report(embeddings, sample, args.min_top1)}
+
+    if not args.skip_models:
+        with open(os.path.join(ROOT, "knowledge_base.json"), encoding='utf-8') as f:
+            kb = json.load(f)
+        if df is not None:
+            questions = df['question'].astype(str).tolist()
+        else:
+            questions = [f"{name}: {entry[s]}" for name, entry in kb["conditions"].items()
+                         for s in ("description", "first_aid", "prevention")]
+        queries = make_workload(args.queries, 0.3, seed=1)
+        report["embedding_model"] = embedding_report(questions, queries, args.min_top1)
+        texts = [entry[s] for entry in kb["conditions"].values() for s in ("description", "first_aid", "prevention")]
+        report["translation_model"] = translation_report(texts, args.min_chrf)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Share of a sample workload answered by the compiled intent router, and the
+latency it saves compared with encoding and searching the same queries.
+
+    python benchmarks/router_fast_path.py [--skip-model]
+
+--skip-model reports only the router side (no SentenceTransformer load).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chatbot_logic import ROUTER
+from semantic_engine import encode_query, find_best_match
+
+WORKLOAD = [
+    "hello", "hi there", "thanks", "thank you", "bye", "नमस्ते", "धन्यवाद",
+    "fever", "first aid for a burn", "symptoms of cold", "how to treat a cut", "headache remedy",
+    "how to prevent a cold", "मुझे बुखार है", "बुखार का इलाज", "सिरदर्द के लक्षण",
+    "what should I eat when I have diarrhoea", "is it safe to exercise with a sprained ankle",
+    "how much water should I drink every day", "मधुमेह में क्या खाना चाहिए",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--skip-model", action="store_true")
+    args = parser.parse_args()
+
+    routed = [q for q in WORKLOAD if ROUTER.route(q) is not None]
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for query in WORKLOAD:
+            ROUTER.route(query)
+    route_us = (time.perf_counter() - start) / (args.repeat * len(WORKLOAD)) * 1e6
+
+    report = {
+        "queries": len(WORKLOAD),
+        "fast_path_fraction": round(len(routed) / len(WORKLOAD), 3),
+        "route_us_per_query": round(route_us, 2),
+    }
+
+    if not args.skip_model:
+        encode_query(WORKLOAD[0])  # load the model and the index first
+        find_best_match(WORKLOAD[0])
+        start = time.perf_counter()
+        for query in routed:
+            find_best_match(query, encode_query(query))
+        model_ms = (time.perf_counter() - start) / max(1, len(routed)) * 1000
+        report["model_path_ms_per_query"] = round(model_ms, 2)
+        report["saved_ms_per_routed_query"] = round(model_ms - route_us / 1000, 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Hit rate and decoded-token savings of the segment translation memory
+against whole-text translation caching, over simulated Hindi chat traffic.
+
+    python benchmarks/segment_translation.py --stub --responses 2000
+
+Replies are drawn with Zipf-like popularity from the dataset answers (or
+synthetic answers stitched from knowledge-base sentences), the
+knowledge-base replies and the fallback, composed exactly as the chat page
+sends them to translation. Both modes start from an empty memory in a
+throwaway database; decoded tokens are the target-side token counts of
+everything the model had to generate.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from pipeline import prepare_workdir, _enter_workdir
+
+
+def count_tokens(tokenizer, texts):
+    try:
+        ids = tokenizer(text_target=texts)["input_ids"]
+    except TypeError:
+        ids = tokenizer(texts)["input_ids"]
+    return sum(len(x) for x in ids)
+
+
+SOURCES = ["WHO", "CDC", "NHS", "Mayo Clinic", "MoHFW India"]
+
+
+def synthetic_answers(n, seed):
+    """Answers built from two or three knowledge-base sentences, so many share sentences but not the whole text."""
+    with open("knowledge_base.json", encoding='utf-8') as f:
+        kb = json.load(f)["conditions"]
+    sentences = [kb[c][s] for c in sorted(kb) for s in ("description", "first_aid", "prevention") if kb[c].get(s)]
+    rng = np.random.default_rng(seed)
+    return [
+        {"answer": " ".join(sentences[i] for i in rng.choice(len(sentences), size=rng.integers(2, 4), replace=False)),
+         "source": SOURCES[rng.integers(len(SOURCES))]}
+        for _ in range(n)
+    ]
+
+
+def sample_responses(n, answers, seed):
+    from chatbot_logic import KNOWLEDGE_BASE, compose_response_en, compose_kb_response_en
+    from knowledge_base import SECTIONS
+    pool = [compose_response_en(None)]
+    pool += [compose_kb_response_en(c, s) for c in KNOWLEDGE_BASE.get().records for s in (None, *SECTIONS)]
+    pool += [compose_response_en(row) for row in answers]
+    pool = list(dict.fromkeys(pool))
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, len(pool) + 1)
+    order = rng.permutation(len(pool))
+    picks = rng.choice(len(pool), size=n, p=popularity / popularity.sum())
+    return [pool[order[i]] for i in picks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stub", action="store_true", help="Use stub models (offline, CPU only).")
+    parser.add_argument("--responses", type=int, default=2000)
+    parser.add_argument("--dataset", help="CSV to draw answers from instead of synthetic ones.")
+    parser.add_argument("--answers", type=int, default=500, help="Synthetic answers when no --dataset is given.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    dataset = os.path.abspath(args.dataset) if args.dataset else None
+    workdir = tempfile.mkdtemp(prefix="wellbot-tm-")
+    try:
+        prepare_workdir(workdir, dataset, 100)
+        _enter_workdir(workdir, args.stub)
+        from chatbot_logic import TRANSLATION_MEMORY, get_translation_model, translate_offline
+        from translation_memory import TranslationMemory
+        from semantic_engine import load_dataset
+        _, tokenizer = get_translation_model("en_hi")
+        if dataset:
+            answers = [row for _, row in load_dataset().iterrows()]
+        else:
+            answers = synthetic_answers(args.answers, args.seed)
+        responses = sample_responses(args.responses, answers, args.seed)
+
+        decoded = {"whole": 0, "segments": 0}
+        elapsed = {}
+
+        # Whole-text caching, as translate_to_hindi worked before segmenting.
+        start = time.perf_counter()
+        seen = {}
+        for text in responses:
+            if text not in seen:
+                seen[text] = translate_offline([text])[0]
+                decoded["whole"] += count_tokens(tokenizer, [seen[text]])
+        elapsed["whole"] = time.perf_counter() - start
+        whole_hit_rate = 1 - len(seen) / len(responses)
+
+        def counting_translate(texts):
+            outputs = translate_offline(texts)
+            decoded["segments"] += count_tokens(tokenizer, outputs)
+            return outputs
+
+        memory = TranslationMemory("bench-segments", counting_translate, TRANSLATION_MEMORY.reference)
+        start = time.perf_counter()
+        for text in responses:
+            memory.translate(text)
+        elapsed["segments"] = time.perf_counter() - start
+        report = memory.report()
+    finally:
+        os.chdir(BENCH_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    n = len(responses)
+    print(json.dumps({
+        "responses": n,
+        "distinct_responses": len(seen),
+        "whole_text": {
+            "hit_rate": round(whole_hit_rate, 4),
+            "decoded_tokens_per_response": round(decoded["whole"] / n, 2),
+            "seconds": round(elapsed["whole"], 3),
+        },
+        "segments": {
+            "text_hit_rate": round(report["text_hit_rate"], 4),
+            "segment_hit_rate": round(report["segment_hit_rate"], 4),
+            "segments_translated": report["segments_translated"],
+            "decoded_tokens_per_response": round(decoded["segments"] / n, 2),
+            "seconds": round(elapsed["segments"], 3),
+        },
+        "decoded_token_reduction": round(1 - decoded["segments"] / decoded["whole"], 4) if decoded["whole"] else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
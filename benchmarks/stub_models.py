@@ -0,0 +1,79 @@
+"""
+Small deterministic stand-ins for the SentenceTransformer and Marian models,
+so the benchmarks run offline on CPU-only machines without downloading
+weights. They exercise the same call signatures as the real models; the
+numbers they produce measure pipeline overhead, not model quality.
+
+    import stub_models
+    stub_models.install()   # before the first model is used
+"""
+import hashlib
+import numpy as np
+from nlu_engine import tokenize
+
+EMBEDDING_DIM = 384
+
+
+class StubSentenceTransformer:
+    """Hashed bag-of-words embeddings: texts sharing words get similar vectors."""
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        self._buckets = {}
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _bucket(self, token):
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            bucket = self._buckets[token] = (value % self.dim, 1.0 if value >> 63 else -1.0)
+        return bucket
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text.lower()):
+                column, sign = self._bucket(token)
+                out[row, column] += sign
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            out /= norms
+        return out[0] if single else out
+
+
+class StubMarianTokenizer:
+    """Whitespace tokenizer with the call/decode surface translate() uses."""
+
+    def __call__(self, texts, return_tensors=None, padding=False, truncation=False, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        input_ids = [text.split() for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def decode(self, token_ids, skip_special_tokens=True):
+        return " ".join(token_ids)
+
+    def batch_decode(self, sequences, skip_special_tokens=True):
+        return [self.decode(ids) for ids in sequences]
+
+
+class StubMarianModel:
+    """'Translates' by tagging every token, one decoder step per input token."""
+
+    def generate(self, input_ids=None, attention_mask=None, **kwargs):
+        return [[f"hi:{token}" for token in ids] for ids in input_ids]
+
+
+def install():
+    """Replaces every model handle the chat pipeline uses with a stub."""
+    from semantic_engine import SEMANTIC_MODEL
+    from chatbot_logic import TRANSLATION_MODELS
+    SEMANTIC_MODEL.override(StubSentenceTransformer())
+    for handle in TRANSLATION_MODELS.values():
+        handle.override((StubMarianModel(), StubMarianTokenizer()))
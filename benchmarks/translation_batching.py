@@ -0,0 +1,83 @@
+"""
+Throughput and tail latency of per-call translation versus TranslationBatcher.
+
+    python benchmarks/translation_batching.py --clients 8 --requests 64
+
+Each client thread translates its share of the requests. On the per-call
+path every thread calls model.generate itself, concurrently and without a
+lock, as the Streamlit script threads do without the batcher.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chatbot_logic import get_translation_model, translate, TranslationBatcher
+
+SAMPLES = [
+    "Get plenty of rest and drink lots of fluids.",
+    "Rest in a quiet, dark room, stay hydrated, and apply a cold pack to your forehead.",
+    "For a minor cut, wash the area with soap and water, apply an antiseptic, and cover it with a sterile bandage.",
+    "Wash your hands frequently and avoid touching your face to prevent infections.",
+    "For a minor burn, immediately run cool water over the area for 10-15 minutes.",
+]
+
+
+def run_clients(clients, requests, call):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(worker_id):
+        for i in range(worker_id, requests, clients):
+            # A numeric suffix keeps texts distinct so coalescing does not flatter the batcher.
+            text = f"{SAMPLES[i % len(SAMPLES)]} ({i})"
+            start = time.perf_counter()
+            call(text)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(w,)) for w in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    model, tokenizer = get_translation_model("en_hi")
+
+    def per_call(text):
+        return translate(text, model, tokenizer)
+
+    batcher = TranslationBatcher(model, tokenizer, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    translate(SAMPLES[0], model, tokenizer)  # warm up
+
+    report = {
+        "clients": args.clients,
+        "requests": args.requests,
+        "per_call": run_clients(args.clients, args.requests, per_call),
+        "batched": run_clients(args.clients, args.requests, batcher.translate),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,192 @@
 import streamlit as st
-from semantic_engine import find_best_match
+from semantic_engine import find_best_match, encode_query, encode_texts, current_index_key, SIMILARITY_THRESHOLD
+from response_cache import ResponseCache
+from intent_router import IntentRouter
+from knowledge_base import KnowledgeBaseStore, SECTION_LABELS
 import pandas as pd
+import os
 import re
-from transformers import MarianMTModel, MarianTokenizer
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from db_functions import get_translation, save_translations
+from translation_memory import TranslationMemory, text_hash
+from model_loader import LazyModel, configure_torch, quantize_model, model_version
+import metrics
+from inference_client import get_client, mark_unavailable, InferenceUnavailable, CLIENT_MODE
 
-# --- Re-introducing Translation Models ---
-@st.cache_resource
-def get_translation_models():
-    """Loads and returns the translation models and tokenizers."""
-    # English to Hindi
-    en_hi_model_name = "Helsinki-NLP/opus-mt-en-hi"
-    en_hi_tokenizer = MarianTokenizer.from_pretrained(en_hi_model_name)
-    en_hi_model = MarianMTModel.from_pretrained(en_hi_model_name)
-
-    # Hindi to English
-    hi_en_model_name = "Helsinki-NLP/opus-mt-hi-en"
-    hi_en_tokenizer = MarianTokenizer.from_pretrained(hi_en_model_name)
-    hi_en_model = MarianMTModel.from_pretrained(hi_en_model_name)
-    
-    return {
-        "en_hi": (en_hi_model, en_hi_tokenizer),
-        "hi_en": (hi_en_model, hi_en_tokenizer)
-    }
+EN_HI_MODEL_NAME = "Helsinki-NLP/opus-mt-en-hi"
+HI_EN_MODEL_NAME = "Helsinki-NLP/opus-mt-hi-en"
+# Stored translations are keyed by this, so int8 output is never served to float32 runs or vice versa.
+EN_HI_MODEL_VERSION = model_version(EN_HI_MODEL_NAME)
+
+# --- Translation batching settings ---
+TRANSLATION_MAX_BATCH = int(os.environ.get("WELLBOT_TRANSLATION_MAX_BATCH", "16"))
+TRANSLATION_MAX_WAIT_MS = float(os.environ.get("WELLBOT_TRANSLATION_MAX_WAIT_MS", "5"))
+TRANSLATION_QUEUE_DEPTH = int(os.environ.get("WELLBOT_TRANSLATION_QUEUE_DEPTH", "256"))
+# Translate replies sentence by sentence through the translation memory; "0" translates whole texts.
+SEGMENT_TRANSLATION = os.environ.get("WELLBOT_SEGMENT_TRANSLATION", "1") == "1"
+
+# --- Translation Models (loaded on first use) ---
+def _load_marian(model_name, quantize=None):
+    """Loads a Marian model and tokenizer. transformers is imported here to keep module import cheap."""
+    from transformers import MarianMTModel, MarianTokenizer
+    configure_torch()
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+    model = quantize_model(MarianMTModel.from_pretrained(model_name), quantize)
+    return model, tokenizer
+
+TRANSLATION_MODELS = {
+    "en_hi": LazyModel("marian_en_hi", lambda: _load_marian(EN_HI_MODEL_NAME), warm=not CLIENT_MODE),
+    # Not used by the chat pipeline yet, so it is not part of the warm-up.
+    "hi_en": LazyModel("marian_hi_en", lambda: _load_marian(HI_EN_MODEL_NAME), warm=False),
+}
 
+def get_translation_model(direction):
+    """Returns (model, tokenizer) for "en_hi" or "hi_en", loading it on first use."""
+    return TRANSLATION_MODELS[direction].get()
+
+@metrics.timed("translate.generate")
 def translate(text, model, tokenizer):
     """Translates a given text using the specified model and tokenizer."""
     tokens = tokenizer(text, return_tensors="pt", padding=True)
     translated_tokens = model.generate(**tokens)
     return tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
 
-# Load models on startup
-MODELS = get_translation_models()
+@metrics.timed("translate.generate_batch")
+def translate_batch(texts, model, tokenizer):
+    """Translates a list of texts with a single padded generate call."""
+    tokens = tokenizer(texts, return_tensors="pt", padding=True)
+    translated_tokens = model.generate(**tokens)
+    return tokenizer.batch_decode(translated_tokens, skip_special_tokens=True)
+
+class TranslationBatcher:
+    """
+    Background worker that collects translation requests from every session
+    for up to max_wait_ms and runs them as length-bucketed generate batches.
+    submit() returns a Future; identical texts already in flight share one.
+    """
+
+    def __init__(self, model, tokenizer, max_batch=TRANSLATION_MAX_BATCH,
+                 max_wait_ms=TRANSLATION_MAX_WAIT_MS, queue_depth=TRANSLATION_QUEUE_DEPTH):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="translation-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """Queues text for translation; blocks if the queue is full."""
+        with self._lock:
+            future = self._in_flight.get(text)
+            if future is not None:
+                return future
+            future = Future()
+            self._in_flight[text] = future
+        self._queue.put(text)
+        return future
+
+    def translate(self, text):
+        return self.submit(text).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _buckets(texts):
+        """Groups texts of similar length so padding stays small."""
+        texts = sorted(texts, key=len)
+        bucket = [texts[0]]
+        for text in texts[1:]:
+            if len(text) > 2 * max(1, len(bucket[0])):
+                yield bucket
+                bucket = []
+            bucket.append(text)
+        yield bucket
+
+    def _run(self):
+        while True:
+            for bucket in self._buckets(self._collect()):
+                try:
+                    results = translate_batch(bucket, self.model, self.tokenizer)
+                except Exception as e:
+                    results = [e] * len(bucket)
+                for text, result in zip(bucket, results):
+                    with self._lock:
+                        future = self._in_flight.pop(text)
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+@st.cache_resource
+def get_translation_batcher():
+    """One en->hi batching worker per process, shared by all sessions."""
+    model, tokenizer = get_translation_model("en_hi")
+    return TranslationBatcher(model, tokenizer)
+
+@st.cache_resource
+def get_response_cache():
+    """Process-wide cache of final responses, shared by all sessions."""
+    return ResponseCache()
+
+def translate_en_hi_many(texts):
+    """Translates via the shared inference server if configured, else the local batcher."""
+    client = get_client()
+    if client is not None:
+        try:
+            return client.translate(texts)
+        except InferenceUnavailable as e:
+            mark_unavailable(e)
+    batcher = get_translation_batcher()
+    # Submitting everything first lets the batcher run the texts as shared generate batches.
+    futures = [batcher.submit(text) for text in texts]
+    return [future.result() for future in futures]
+
+def translate_offline(texts, batch_size=TRANSLATION_MAX_BATCH):
+    """Translates texts on the local model in length-bucketed generate batches, for offline jobs."""
+    model, tokenizer = get_translation_model("en_hi")
+    translated = {}
+    for bucket in TranslationBatcher._buckets(list(dict.fromkeys(texts))):
+        for start in range(0, len(bucket), batch_size):
+            chunk = bucket[start:start + batch_size]
+            translated.update(zip(chunk, translate_batch(chunk, model, tokenizer)))
+    return [translated[text] for text in texts]
+
+def translate_to_hindi(text):
+    """
+    Serves English->Hindi translations from the translations table (filled
+    offline by pretranslate.py) and only runs the MT model on a cache miss,
+    for the novel sentences only when SEGMENT_TRANSLATION is on.
+    """
+    if SEGMENT_TRANSLATION:
+        with metrics.stage("translate.memory"):
+            return TRANSLATION_MEMORY.translate(text)
+    source_hash = text_hash(text)
+    cached = get_translation(source_hash, EN_HI_MODEL_VERSION)
+    if cached is not None:
+        metrics.inc("translate.memory_hits")
+        return cached
+    metrics.inc("translate.memory_misses")
+    with metrics.stage("translate.model"):
+        translated = translate_en_hi_many([text])[0]
+    save_translations([(source_hash, EN_HI_MODEL_VERSION, text, translated)])
+    return translated
 
 # --- Bilingual Config ---
 CONFIG = {
@@ -51,50 +207,126 @@ CONFIG = {
     }
 }
 
-def get_bot_response(user_input):
+# Curated Hindi for the fixed replies takes precedence over machine translation.
+TRANSLATION_MEMORY = TranslationMemory(
+    EN_HI_MODEL_VERSION, translate_en_hi_many,
+    reference={CONFIG["responses"][f"{key}_en"]: CONFIG["responses"][f"{key}_hi"]
+               for key in ("greeting", "farewell", "fallback", "disclaimer")},
+)
+
+KNOWLEDGE_BASE = KnowledgeBaseStore(encode=encode_texts)
+# Callers pass the current snapshot to ROUTER.route, which recompiles the
+# router when the knowledge base is reloaded.
+ROUTER = IntentRouter(CONFIG, KNOWLEDGE_BASE.get())
+
+def compose_kb_response_en(condition, section, kb=None):
     """
-    Main pipeline for the bot (Multilingual, QA-based).
-    1. Detects language.
-    2. Checks for simple greetings/farewells.
-    3. Uses semantic search to find the best matching question.
-    4. Returns the corresponding answer from the CSV, translated if needed.
+    English reply for a knowledge_base.json condition; section None gives
+    description plus first aid. Returns None if the condition is unknown.
     """
-    user_input_lower = user_input.lower()
-    
-    # 1. Detect Language
-    is_hindi = bool(re.search(r'[^\x00-\x7F]', user_input))
-    lang = "hi" if is_hindi else "en"
-    
-    # 2. Check for Greetings
-    if any(greet in user_input_lower for greet in (CONFIG["greetings_en"] + CONFIG["greetings_hi"])):
-        return CONFIG["responses"][f"greeting_{lang}"]
-
-    # 3. Check for Farewells
-    if any(farewell in user_input_lower for farewell in (CONFIG["farewells_en"] + CONFIG["farewells_hi"])):
-        return CONFIG["responses"][f"farewell_{lang}"]
+    kb = kb or KNOWLEDGE_BASE.get()
+    if condition not in kb.records:
+        return None
+    title = condition.capitalize()
+    if section is None:
+        response_en = (f"**{title}:** {kb.lookup(condition, 'description')}"
+                       f"\n\n**First aid:** {kb.lookup(condition, 'first_aid')}")
+    else:
+        response_en = f"**{title} - {SECTION_LABELS[section]}:** {kb.lookup(condition, section)}"
+    return response_en + f"\n\n{CONFIG['responses']['disclaimer_en']}"
 
-    # 4. Perform Semantic Search. The model is multilingual, so no
-    # translation is needed for the query itself.
-    best_match_row, score = find_best_match(user_input)
-    
+def compose_response_en(best_match_row):
+    """Builds the full English reply (answer, source and disclaimer) for a match or None."""
     if best_match_row is not None:
-        # 5. We found a match! The answer is in English.
+        # We found a match! The answer is in English.
         response_en = best_match_row['answer']
-        
+
         if 'source' in best_match_row and pd.notna(best_match_row['source']):
             response_en += f"\n\n*(Source: {best_match_row['source']})*"
     else:
-        # 6. No good match was found.
-        response_en = CONFIG["responses"][f"fallback_en"]
+        # No good match was found.
+        response_en = CONFIG["responses"]["fallback_en"]
 
-    # 7. Append the Ethical Disclaimer in English
+    # Append the Ethical Disclaimer in English
     response_en += f"\n\n{CONFIG['responses']['disclaimer_en']}"
-    
-    # 8. Translate the final English response back to Hindi if needed
+    return response_en
+
+def detect_language(text):
+    """"hi" if text contains any non-ASCII character, else "en"."""
+    return "hi" if re.search(r'[^\x00-\x7F]', text) else "en"
+
+@metrics.timed("chat.total")
+def get_bot_response(user_input):
+    """
+    Main pipeline for the bot (Multilingual, QA-based).
+    1. Detects language.
+    2. Routes greetings, farewells, condition questions and symptom lists without models.
+    3. Serves repeated or near-duplicate queries from the response cache.
+    4. Uses semantic search over the CSV questions and knowledge-base sections.
+    5. Returns the best answer, translated if needed.
+    """
+    metrics.inc("chat.requests")
+    # 1. Detect Language
+    with metrics.stage("chat.detect_language"):
+        lang = detect_language(user_input)
+    is_hindi = lang == "hi"
+    metrics.inc(f"chat.lang.{lang}")
+
+    # 2. Fast path: greetings, farewells, direct condition questions and
+    # symptom-only queries are answered from the compiled router and the
+    # knowledge-base indexes without any model inference.
+    kb = KNOWLEDGE_BASE.get()
+    with metrics.stage("chat.route"):
+        route = ROUTER.route(user_input, kb)
+    if route is not None:
+        metrics.inc(f"chat.route.{route.intent}")
+        if route.intent in ("greeting", "farewell"):
+            return CONFIG["responses"][f"{route.intent}_{lang}"]
+        response_en = compose_kb_response_en(route.condition, route.section, kb)
+        if response_en is not None:
+            return translate_to_hindi(response_en) if is_hindi else response_en
+
+    # 3. Serve repeated and near-duplicate queries from the response cache.
+    cache = get_response_cache()
+    with metrics.stage("chat.cache_lookup"):
+        cache.ensure_version((current_index_key(), kb.version))
+        cached = cache.get(user_input, lang)
+    if cached is not None:
+        metrics.inc("chat.cache.exact_hits")
+        return cached
+    # The model is multilingual, so no translation is needed for the query itself.
+    with metrics.stage("chat.encode_query"):
+        query_embedding = encode_query(user_input)
+    cached = cache.get_similar(query_embedding, lang)
+    if cached is not None:
+        metrics.inc("chat.cache.semantic_hits")
+        cache.put(user_input, lang, None, cached)
+        return cached
+    metrics.inc("chat.cache.misses")
+
+    # 4. Perform Semantic Search with the embedding computed above, over both
+    # the CSV questions and the knowledge-base sections.
+    with metrics.stage("chat.find_best_match"):
+        best_match_row, score = find_best_match(user_input, query_embedding)
+    with metrics.stage("chat.kb_search"):
+        kb_condition, kb_section, kb_score = kb.search(query_embedding, encode_texts)
+    metrics.observe("chat.similarity_score", score, metrics.SCORE_BUCKETS)
+    metrics.observe("chat.kb_similarity_score", kb_score, metrics.SCORE_BUCKETS)
+
+    # 5. Build the English reply from the better source (or the fallback)
+    if kb_score >= SIMILARITY_THRESHOLD and kb_score > score:
+        metrics.inc("chat.source.knowledge_base")
+        response_en = compose_kb_response_en(kb_condition, kb_section, kb)
+    else:
+        metrics.inc("chat.source.dataset" if best_match_row is not None else "chat.source.fallback")
+        response_en = compose_response_en(best_match_row)
+
+    # 6. Translate the final English response back to Hindi if needed
     if is_hindi:
-        model, tokenizer = MODELS["en_hi"]
-        final_response = translate(response_en, model, tokenizer)
+        with metrics.stage("chat.translate"):
+            final_response = translate_to_hindi(response_en)
     else:
         final_response = response_en
-    
-    return final_response
\ No newline at end of file
+
+    cache.put(user_input, lang, query_embedding, final_response)
+    return final_response
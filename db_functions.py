@@ -1,18 +1,41 @@
+import os
+import queue
 import sqlite3
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
 import bcrypt
+import metrics
 
-def init_db():
-    """Initializes the SQLite database and creates tables if they don't exist."""
-    conn = sqlite3.connect('healthbot.sqlite', check_same_thread=False)
-    c = conn.cursor()
-    c.execute('''
+DB_PATH = os.environ.get("WELLBOT_DB_PATH", "healthbot.sqlite")
+DB_POOL_SIZE = int(os.environ.get("WELLBOT_DB_POOL_SIZE", "8"))
+
+# --- Password hashing settings ---
+BCRYPT_ROUNDS = int(os.environ.get("WELLBOT_BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.environ.get("WELLBOT_AUTH_WORKERS", str(os.cpu_count() or 2)))
+AUTH_MAX_PENDING = int(os.environ.get("WELLBOT_AUTH_MAX_PENDING", "32"))
+AUTH_TIMEOUT = float(os.environ.get("WELLBOT_AUTH_TIMEOUT", "10"))
+
+PROFILE_CACHE_SIZE = int(os.environ.get("WELLBOT_PROFILE_CACHE_SIZE", "4096"))
+
+# Returned by add_user/authenticate_user when the hashing pool is saturated.
+AUTH_BUSY = "busy"
+
+# --- Schema migrations ---
+# Each entry upgrades the schema by one version; PRAGMA user_version records
+# how many have been applied, so the DDL only ever runs once per database.
+MIGRATIONS = [
+    [
+        '''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             email TEXT UNIQUE NOT NULL,
             password TEXT NOT NULL
         )
-    ''')
-    c.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS profiles (
             user_id INTEGER PRIMARY KEY,
             name TEXT,
@@ -20,55 +43,284 @@ def init_db():
             language TEXT,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
-    ''')
-    conn.commit()
-    conn.close()
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS translations (
+            source_hash TEXT NOT NULL,
+            model_version TEXT NOT NULL,
+            source_text TEXT NOT NULL,
+            translated_text TEXT NOT NULL,
+            PRIMARY KEY (source_hash, model_version)
+        )
+        ''',
+    ],
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_messages_user_time ON messages (user_id, created_at)",
+    ],
+]
+
+# --- Connection pool ---
+_pool = queue.LifoQueue()
+_pool_lock = threading.Lock()
+_pool_created = 0
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def _new_connection():
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=30, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA cache_size=-8000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+@contextmanager
+def get_connection():
+    """
+    Borrows a pooled WAL-mode connection. Commits when the block succeeds and
+    rolls back if it raises; the connection always goes back to the pool.
+    """
+    global _pool_created
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        with _pool_lock:
+            create = _pool_created < DB_POOL_SIZE
+            if create:
+                _pool_created += 1
+        if create:
+            try:
+                conn = _new_connection()
+            except Exception:
+                with _pool_lock:
+                    _pool_created -= 1
+                raise
+        else:
+            conn = _pool.get()
+    try:
+        with conn:
+            yield conn
+    finally:
+        _pool.put(conn)
+
+def init_db():
+    """Initializes the SQLite database and applies pending migrations, once per process."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+        _schema_ready = True
+
+# --- Password hashing pool ---
+# bcrypt releases the GIL, so a thread pool keeps hashing off the Streamlit
+# script threads. The semaphore caps running + queued jobs; beyond that,
+# callers get AUTH_BUSY immediately instead of piling up.
+_auth_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt")
+_auth_slots = threading.BoundedSemaphore(AUTH_WORKERS + AUTH_MAX_PENDING)
+
+def _run_auth_job(fn, *args):
+    if not _auth_slots.acquire(blocking=False):
+        return AUTH_BUSY
+    try:
+        future = _auth_executor.submit(fn, *args)
+    except Exception:
+        _auth_slots.release()
+        raise
+    future.add_done_callback(lambda _: _auth_slots.release())
+    try:
+        return future.result(timeout=AUTH_TIMEOUT)
+    except FutureTimeout:
+        return AUTH_BUSY
 
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
 
 def check_password(hashed_password, user_password):
     return bcrypt.checkpw(user_password.encode('utf-8'), hashed_password)
 
+def hash_rounds(hashed_password):
+    """Work factor encoded in a bcrypt hash such as $2b$12$..."""
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+    return int(hashed_password.split(b'$')[2])
+
+def _verify_and_upgrade(hashed_password, user_password):
+    """Checks a password and, if its cost differs from BCRYPT_ROUNDS, returns a fresh hash too."""
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+    if not check_password(hashed_password, user_password):
+        return False, None
+    if hash_rounds(hashed_password) != BCRYPT_ROUNDS:
+        return True, hash_password(user_password)
+    return True, None
+
+@metrics.timed("db.add_user")
 def add_user(email, password):
-    conn = sqlite3.connect('healthbot.sqlite', check_same_thread=False)
-    c = conn.cursor()
+    hashed = _run_auth_job(hash_password, password)
+    if hashed is AUTH_BUSY:
+        return AUTH_BUSY
     try:
-        hashed = hash_password(password)
-        c.execute("INSERT INTO users (email, password) VALUES (?, ?)", (email, hashed))
-        user_id = c.lastrowid
-        # Create a default profile upon registration
-        c.execute("INSERT INTO profiles (user_id, name, language) VALUES (?, ?, ?)", (user_id, '', 'English'))
-        conn.commit()
+        with get_connection() as conn:
+            c = conn.execute("INSERT INTO users (email, password) VALUES (?, ?)", (email, hashed))
+            user_id = c.lastrowid
+            # Create a default profile upon registration
+            conn.execute("INSERT INTO profiles (user_id, name, language) VALUES (?, ?, ?)", (user_id, '', 'English'))
+        invalidate_profile(user_id)
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
+@metrics.timed("db.authenticate_user")
 def authenticate_user(email, password):
-    conn = sqlite3.connect('healthbot.sqlite', check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT id, password FROM users WHERE email = ?", (email,))
-    user_data = c.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        user_data = conn.execute("SELECT id, password FROM users WHERE email = ?", (email,)).fetchone()
     if user_data:
         user_id, hashed_password = user_data
-        if check_password(hashed_password, password):
+        result = _run_auth_job(_verify_and_upgrade, hashed_password, password)
+        if result is AUTH_BUSY:
+            return AUTH_BUSY
+        ok, new_hash = result
+        if ok:
+            if new_hash is not None:
+                # Transparent rehash after a work-factor change.
+                with get_connection() as conn:
+                    conn.execute("UPDATE users SET password = ? WHERE id = ?", (new_hash, user_id))
             return user_id
     return None
 
+# --- Profile cache ---
+# Process-wide LRU of profile rows so Streamlit reruns do not hit SQLite.
+# Writers bump a per-user version; a reader only stores the row it fetched if
+# no write happened in between, so a stale row can never be cached.
+_profile_cache = OrderedDict()
+_profile_versions = {}
+_profile_lock = threading.Lock()
+_profile_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+def invalidate_profile(user_id):
+    with _profile_lock:
+        _profile_cache.pop(user_id, None)
+        _profile_versions[user_id] = _profile_versions.get(user_id, 0) + 1
+        _profile_stats["invalidations"] += 1
+
+def profile_cache_stats():
+    with _profile_lock:
+        lookups = _profile_stats["hits"] + _profile_stats["misses"]
+        return dict(_profile_stats, size=len(_profile_cache),
+                    hit_rate=_profile_stats["hits"] / lookups if lookups else 0.0)
+
+@metrics.timed("db.get_profile")
 def get_profile(user_id):
-    conn = sqlite3.connect('healthbot.sqlite', check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT name, age, language FROM profiles WHERE user_id = ?", (user_id,))
-    profile = c.fetchone()
-    conn.close()
+    with _profile_lock:
+        profile = _profile_cache.get(user_id)
+        if profile is not None:
+            _profile_cache.move_to_end(user_id)
+            _profile_stats["hits"] += 1
+            return profile
+        _profile_stats["misses"] += 1
+        version = _profile_versions.get(user_id, 0)
+
+    with get_connection() as conn:
+        profile = conn.execute("SELECT name, age, language FROM profiles WHERE user_id = ?", (user_id,)).fetchone()
+
+    if profile is not None:
+        with _profile_lock:
+            if _profile_versions.get(user_id, 0) == version:
+                _profile_cache[user_id] = profile
+                _profile_cache.move_to_end(user_id)
+                while len(_profile_cache) > PROFILE_CACHE_SIZE:
+                    _profile_cache.popitem(last=False)
     return profile
 
+@metrics.timed("db.update_profile")
 def update_profile(user_id, name, age, language):
-    conn = sqlite3.connect('healthbot.sqlite', check_same_thread=False)
-    c = conn.cursor()
-    c.execute("UPDATE profiles SET name = ?, age = ?, language = ? WHERE user_id = ?", (name, age, language, user_id))
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with get_connection() as conn:
+        conn.execute("UPDATE profiles SET name = ?, age = ?, language = ? WHERE user_id = ?", (name, age, language, user_id))
+    invalidate_profile(user_id)
+
+@metrics.timed("db.get_translation")
+def get_translation(source_hash, model_version):
+    with get_connection() as conn:
+        row = conn.execute("SELECT translated_text FROM translations WHERE source_hash = ? AND model_version = ?", (source_hash, model_version)).fetchone()
+    return row[0] if row else None
+
+@metrics.timed("db.get_translations")
+def get_translations(source_hashes, model_version):
+    """Returns {source_hash: translated_text} for the hashes stored with model_version."""
+    found = {}
+    source_hashes = list(source_hashes)
+    with get_connection() as conn:
+        # Stay well below SQLite's limit on bound parameters per statement.
+        for start in range(0, len(source_hashes), 500):
+            chunk = source_hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(conn.execute(
+                f"SELECT source_hash, translated_text FROM translations WHERE model_version = ? AND source_hash IN ({placeholders})",
+                (model_version, *chunk)))
+    return found
+
+@metrics.timed("db.get_translated_hashes")
+def get_translated_hashes(model_version):
+    """Returns the set of source hashes already translated with model_version."""
+    with get_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT source_hash FROM translations WHERE model_version = ?", (model_version,))}
+
+@metrics.timed("db.save_translations")
+def save_translations(rows):
+    """Stores (source_hash, model_version, source_text, translated_text) rows."""
+    with get_connection() as conn:
+        conn.executemany("INSERT OR REPLACE INTO translations (source_hash, model_version, source_text, translated_text) VALUES (?, ?, ?, ?)", rows)
+
+# --- Chat history ---
+@metrics.timed("db.add_messages")
+def add_messages(user_id, messages):
+    """
+    Appends chat turns in one transaction. Each message dict gets its new
+    'id' and 'created_at' filled in so it can serve as a pagination cursor.
+    """
+    with get_connection() as conn:
+        for message in messages:
+            message.setdefault("created_at", time.time())
+            c = conn.execute("INSERT INTO messages (user_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                             (user_id, message["role"], message["content"], message["created_at"]))
+            message["id"] = c.lastrowid
+    return messages
+
+@metrics.timed("db.get_messages")
+def get_messages(user_id, limit, before=None):
+    """
+    Returns up to limit messages, oldest first, that precede the message
+    dict `before` (or the newest ones when before is None).
+    """
+    query = "SELECT id, role, content, created_at FROM messages WHERE user_id = ?"
+    params = [user_id]
+    if before is not None:
+        query += " AND (created_at, id) < (?, ?)"
+        params += [before["created_at"], before["id"]]
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    with get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [
+        {"id": row[0], "role": row[1], "content": row[2], "created_at": row[3]}
+        for row in reversed(rows)
+    ]
@@ -0,0 +1,65 @@
+"""
+Offline stand-in for google.generativeai.GenerativeModel.
+
+Mimics the parts of the response objects generative_ai.py reads (parts,
+text, prompt_feedback.block_reason, candidates[].finish_reason) and emits
+streamed chunks with configurable delays, so time-to-first-token can be
+tested and benchmarked without network access.
+"""
+import time
+from types import SimpleNamespace
+
+
+class FakeResponse:
+    def __init__(self, text, block_reason=None, finish_reason="STOP"):
+        self.text = text
+        self.parts = [text] if text else []
+        self.prompt_feedback = SimpleNamespace(block_reason=block_reason)
+        self.candidates = [SimpleNamespace(finish_reason=finish_reason)]
+
+
+class FakeGenerativeModel:
+    """
+    chunks: the text pieces to emit, in order.
+    first_chunk_delay / chunk_delay: seconds to sleep before the first and each later chunk.
+    block_reason: block the prompt outright (no chunks at all).
+    safety_stop_after: stop with a SAFETY finish after this many chunks.
+    fail_after: raise RuntimeError after this many chunks.
+    """
+
+    def __init__(self, chunks=None, first_chunk_delay=0.5, chunk_delay=0.05,
+                 block_reason=None, safety_stop_after=None, fail_after=None, model_name="models/fake"):
+        self.chunks = chunks or [
+            "Rest in a quiet, dark room ", "and stay hydrated. ", "A cold pack on your forehead ",
+            "can also help. ", "This is general wellness advice, not a medical diagnosis.",
+        ]
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.block_reason = block_reason
+        self.safety_stop_after = safety_stop_after
+        self.fail_after = fail_after
+        self.model_name = model_name
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if stream:
+            return self._stream()
+        chunks = list(self._stream())
+        if self.block_reason:
+            return FakeResponse("", block_reason=self.block_reason)
+        return FakeResponse("".join(c.text for c in chunks))
+
+    def _stream(self):
+        if self.block_reason:
+            time.sleep(self.first_chunk_delay)
+            yield FakeResponse("", block_reason=self.block_reason)
+            return
+        for i, text in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("Fake backend failure")
+            time.sleep(self.first_chunk_delay if i == 0 else self.chunk_delay)
+            if self.safety_stop_after is not None and i == self.safety_stop_after:
+                yield FakeResponse("", finish_reason="SAFETY")
+                return
+            yield FakeResponse(text)
@@ -1,25 +1,32 @@
 import streamlit as st
-import google.generativeai as genai
-from google.api_core import client_options
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Keep model loading separate
-def load_and_configure_model():
-    """
-    Configures genai, lists available models for diagnostics, and loads the Gemini model.
-    """
-    api_key = None
-    model_name = 'gemini-1.5-flash-latest' # Target model
-    # model_name = 'gemini-pro' # Fallback if flash still fails
+GENAI_CACHE_SIZE = int(os.environ.get("WELLBOT_GENAI_CACHE_SIZE", "512"))
+# Directory for the on-disk answer cache; empty disables it.
+GENAI_CACHE_DIR = os.environ.get("WELLBOT_GENAI_CACHE_DIR", "")
 
-    try:
-        api_key = st.secrets["GOOGLE_API_KEY"]
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY is empty in Streamlit secrets.")
+# --- Process-wide client state ---
+_client_lock = threading.RLock()
+_configured_key = None
+_model_names = None
 
+def _configure(api_key):
+    """Runs genai.configure once per process (again only if the key changes)."""
+    global _configured_key
+    import google.generativeai as genai
+    from google.api_core import client_options
+    with _client_lock:
+        if _configured_key == api_key:
+            return
         logger.info(f"Attempting to configure Google Generative AI for v1 endpoint (generativelanguage.googleapis.com)...")
 
         opts = client_options.ClientOptions(api_endpoint="generativelanguage.googleapis.com") # v1 endpoint
@@ -28,17 +35,46 @@ def load_and_configure_model():
             api_key=api_key,
             client_options=opts
         )
-
+        _configured_key = api_key
         logger.info("Google Generative AI configured for v1 endpoint attempt.")
 
-        # --- DIAGNOSTIC STEP: List available models ---
-        try:
+def list_available_models():
+    """
+    Names of models supporting generateContent. The list is only needed when
+    get_model() builds the process-wide model, so it is read once per process.
+    """
+    global _model_names
+    import google.generativeai as genai
+    with _client_lock:
+        if _model_names is None:
             logger.info("Listing available models after configuration...")
-            available_models = [
+            _model_names = [
                 m.name for m in genai.list_models()
                 if 'generateContent' in m.supported_generation_methods
             ]
-            logger.info(f"Available models supporting 'generateContent': {available_models}")
+            logger.info(f"Available models supporting 'generateContent': {_model_names}")
+        return _model_names
+
+# Keep model loading separate
+def load_and_configure_model():
+    """
+    Configures genai, lists available models for diagnostics, and loads the Gemini model.
+    """
+    import google.generativeai as genai
+    api_key = None
+    model_name = 'gemini-1.5-flash-latest' # Target model
+    # model_name = 'gemini-pro' # Fallback if flash still fails
+
+    try:
+        api_key = st.secrets["GOOGLE_API_KEY"]
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY is empty in Streamlit secrets.")
+
+        _configure(api_key)
+
+        # --- DIAGNOSTIC STEP: List available models (read once per process) ---
+        try:
+            available_models = list_available_models()
 
             # Check if our target model is in the list
             if f'models/{model_name}' not in available_models:
@@ -85,22 +121,119 @@ def load_and_configure_model():
         logger.error(f"Unexpected error loading model: {e}", exc_info=True)
         return None
 
-# Use st.session_state
-if 'genai_model' not in st.session_state:
-    st.session_state.genai_model = load_and_configure_model()
+# --- Shared model handle ---
+# One model per process instead of one per browser session. set_backend()
+# swaps in any object with generate_content(prompt, stream=False) and a
+# model_name attribute, e.g. fake_genai.FakeGenerativeModel for tests.
+_backend_factory = load_and_configure_model
+_model = None
+
+def set_backend(factory):
+    """Replaces the model factory and drops the current model."""
+    global _backend_factory, _model
+    with _client_lock:
+        _backend_factory = factory
+        _model = None
+
+def get_model():
+    """Returns the process-wide model, building it on first use (or after a failed load)."""
+    global _model
+    if _model is not None:
+        return _model
+    with _client_lock:
+        if _model is None:
+            _model = _backend_factory()
+        return _model
+
+# --- Answer cache ---
+class AnswerCache:
+    """LRU of generated answers, optionally mirrored to one JSON file per key on disk."""
+
+    def __init__(self, max_entries=GENAI_CACHE_SIZE, cache_dir=GENAI_CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(context, query, lang, model_name):
+        payload = json.dumps([context, query, lang, model_name], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+        if self.cache_dir:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    text = json.load(f)["text"]
+            except (OSError, ValueError, KeyError):
+                text = None
+            if text is not None:
+                self._remember(key, text)
+                with self._lock:
+                    self.hits += 1
+                return text
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key, text):
+        self._remember(key, text)
+        if self.cache_dir:
+            self._write(key, text)
+
+    def _write(self, key, text):
+        """
+        Mirrors an answer to disk through a temporary file unique to this
+        writer. Failures are only logged: the disk copy must never break the
+        reply it caches.
+        """
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=key + ".", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"text": text}, f, ensure_ascii=False)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write answer cache file for {key}: {e}")
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+ANSWER_CACHE = AnswerCache()
 
-# --- generate_response function remains the same ---
-def generate_response(context, query, lang="en"):
-    model = st.session_state.genai_model
+SAFETY_MESSAGE = "I apologize, but I cannot provide a response on that specific topic due to safety guidelines."
+
+def _get_model():
+    model = get_model()
     if model is None:
-        logger.warning("Generative model was None in generate_response, attempting reload...")
-        st.session_state.genai_model = load_and_configure_model()
-        model = st.session_state.genai_model
-        if model is None:
-             return "Error: The generative AI model could not be loaded. Please check terminal logs."
+        logger.warning("Generative model is not available; it will be reloaded on the next request.")
+    return model
 
+def build_prompt(context, query, lang="en"):
     language_instruction = "in English." if lang == "en" else "in simple, natural Hindi."
-    prompt = f"""
+    return f"""
     You are an expert "Global Wellness Assistant."
     Your user is asking about: "{query}"
     You must ONLY use the following trusted "Context" to answer their question.
@@ -113,22 +246,91 @@ def generate_response(context, query, lang="en"):
 
     Based only on that context, please provide a helpful answer {language_instruction}
     """
+
+def _error_message(e, model):
+    """Maps a generation exception to the text shown to the user."""
+    logger.error(f"Error during content generation: {e}", exc_info=True)
+    st.warning(f"Generative AI error: {type(e).__name__} - {e}")
+    # More specific error message based on the diagnostic check
+    if "not found for API version v1beta" in str(e) or "Model not found" in str(e):
+         return f"Error: The model '{model.model_name}' was not found for the API endpoint the library connected to. Please check terminal logs for available models."
+    elif "response was blocked" in str(e).lower():
+        return SAFETY_MESSAGE
+    else:
+        return f"I'm sorry, I encountered an issue generating a response ({type(e).__name__}). Please try again or rephrase your question."
+
+def _is_blocked(chunk):
+    """True if a response or stream chunk carries a prompt block or a SAFETY finish."""
+    if chunk.prompt_feedback.block_reason:
+        logger.warning(f"Response blocked due to safety settings: {chunk.prompt_feedback.block_reason}")
+        return True
+    for candidate in getattr(chunk, "candidates", None) or []:
+        finish_reason = getattr(candidate.finish_reason, "name", candidate.finish_reason)
+        if finish_reason == "SAFETY":
+            logger.warning("Response stopped mid-stream due to safety settings.")
+            return True
+    return False
+
+def generate_response(context, query, lang="en", model=None):
+    model = model or _get_model()
+    if model is None:
+         return "Error: The generative AI model could not be loaded. Please check terminal logs."
+
+    cache_key = AnswerCache.key(context, query, lang, model.model_name)
+    cached = ANSWER_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt = build_prompt(context, query, lang)
     try:
         response = model.generate_content(prompt)
         if not response.parts:
              if response.prompt_feedback.block_reason:
                  logger.warning(f"Response blocked due to safety settings: {response.prompt_feedback.block_reason}")
-                 return "I apologize, but I cannot provide a response on that specific topic due to safety guidelines."
+                 return SAFETY_MESSAGE
              else:
                  raise ValueError("Received an empty response from the API.")
+        ANSWER_CACHE.put(cache_key, response.text)
         return response.text
     except Exception as e:
-        logger.error(f"Error during content generation: {e}", exc_info=True)
-        st.warning(f"Generative AI error: {type(e).__name__} - {e}")
-        # More specific error message based on the diagnostic check
-        if "not found for API version v1beta" in str(e) or "Model not found" in str(e):
-             return f"Error: The model '{model.model_name}' was not found for the API endpoint the library connected to. Please check terminal logs for available models."
-        elif "response was blocked" in str(e).lower():
-            return "I apologize, but I cannot provide a response on that specific topic due to safety guidelines."
-        else:
-            return f"I'm sorry, I encountered an issue generating a response ({type(e).__name__}). Please try again or rephrase your question."
\ No newline at end of file
+        return _error_message(e, model)
+
+def generate_response_stream(context, query, lang="en", model=None):
+    """
+    Streaming variant of generate_response: yields text chunks as the model
+    produces them, suitable for st.write_stream. A safety block or an error
+    that happens mid-stream ends the stream with the same user-facing message
+    the blocking call would return. Cached answers are yielded in one piece.
+    """
+    model = model or _get_model()
+    if model is None:
+        yield "Error: The generative AI model could not be loaded. Please check terminal logs."
+        return
+
+    cache_key = AnswerCache.key(context, query, lang, model.model_name)
+    cached = ANSWER_CACHE.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    prompt = build_prompt(context, query, lang)
+    pieces = []
+    try:
+        for chunk in model.generate_content(prompt, stream=True):
+            if not chunk.parts:
+                if _is_blocked(chunk):
+                    yield ("\n\n" if pieces else "") + SAFETY_MESSAGE
+                    return
+                continue
+            pieces.append(chunk.text)
+            yield chunk.text
+            if _is_blocked(chunk):
+                yield "\n\n" + SAFETY_MESSAGE
+                return
+        if not pieces:
+            raise ValueError("Received an empty response from the API.")
+    except Exception as e:
+        yield ("\n\n" if pieces else "") + _error_message(e, model)
+        return
+    # Only complete, unblocked answers are cached.
+    ANSWER_CACHE.put(cache_key, "".join(pieces))
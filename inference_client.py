@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import socket
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# "unix:/path/to.sock" or "host:port". Empty means everything runs in-process.
+INFERENCE_ADDR = os.environ.get("WELLBOT_INFERENCE_ADDR", "")
+INFERENCE_TIMEOUT = float(os.environ.get("WELLBOT_INFERENCE_TIMEOUT", "30"))
+# After a connection failure, stay on the in-process fallback this many seconds.
+RETRY_AFTER = float(os.environ.get("WELLBOT_INFERENCE_RETRY_AFTER", "30"))
+# How long a reported index key is trusted before asking the server again.
+INFO_TTL = 1.0
+
+CLIENT_MODE = bool(INFERENCE_ADDR)
+
+class InferenceUnavailable(Exception):
+    """Raised when the inference server cannot be reached or its reply cannot be read."""
+
+class InferenceError(Exception):
+    """
+    Raised when the server handled a request but it failed there. The server
+    is still up, so callers must not switch to the in-process models for it.
+    """
+
+def parse_address(address):
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+def send_message(sock_file, payload):
+    sock_file.write(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
+    sock_file.flush()
+
+def read_message(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("Connection closed by peer.")
+    return json.loads(line)
+
+class InferenceClient:
+    """
+    Newline-delimited JSON client for inference_server.py. Keeps one
+    connection per thread and reconnects on failure.
+    """
+
+    def __init__(self, address):
+        self.family, self.target = parse_address(address)
+        self._local = threading.local()
+        self._info = (0.0, None)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            sock.settimeout(INFERENCE_TIMEOUT)
+            sock.connect(self.target)
+            conn = sock.makefile('rwb')
+            self._local.sock, self._local.conn = sock, conn
+        return conn
+
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = self._local.conn = None
+
+    def call(self, op, **params):
+        try:
+            conn = self._connection()
+            send_message(conn, dict(params, op=op))
+            reply = read_message(conn)
+        except (OSError, ValueError) as e:
+            self._drop_connection()
+            raise InferenceUnavailable(f"{op} failed: {e}") from e
+        if "error" in reply:
+            raise InferenceError(f"{op} failed on server: {reply['error']}")
+        return reply
+
+    def encode(self, texts):
+        return self.call("encode", texts=list(texts))["embeddings"]
+
+    def search(self, embedding, k=1, text=None):
+        """Returns (rows, scores) for the k best dataset rows, as dicts of column values."""
+        reply = self.call("search", embedding=[float(x) for x in embedding], k=k, text=text)
+        return reply["rows"], reply["scores"]
+
+    def translate(self, texts):
+        return self.call("translate", texts=list(texts))["translations"]
+
+    def index_key(self):
+        fetched_at, key = self._info
+        if time.monotonic() - fetched_at > INFO_TTL:
+            key = self.call("info")["index_key"]
+            self._info = (time.monotonic(), key)
+        return key
+
+_client = InferenceClient(INFERENCE_ADDR) if CLIENT_MODE else None
+_down_until = 0.0
+
+def get_client():
+    """The shared client, or None when not configured or recently unreachable."""
+    if _client is None or time.monotonic() < _down_until:
+        return None
+    return _client
+
+def mark_unavailable(error):
+    """Switches callers to the in-process fallback for RETRY_AFTER seconds."""
+    global _down_until
+    _down_until = time.monotonic() + RETRY_AFTER
+    logger.warning(f"Inference server unavailable, using in-process models for {RETRY_AFTER:.0f}s: {error}")
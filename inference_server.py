@@ -0,0 +1,159 @@
+"""
+Shared local inference service: one process owns the SentenceTransformer,
+the Marian en->hi model and the dataset embedding matrix, and serves every
+Streamlit worker on the box.
+
+    python inference_server.py --socket /tmp/wellbot-inference.sock
+    python inference_server.py --port 8765
+
+Workers opt in with WELLBOT_INFERENCE_ADDR=unix:/tmp/wellbot-inference.sock
+(or 127.0.0.1:8765). The protocol is one JSON object per line in each
+direction; see inference_client.py.
+"""
+import os
+
+# The server always runs the models in-process, even if the environment it
+# inherited points the chat workers at it.
+os.environ["WELLBOT_INFERENCE_ADDR"] = ""
+
+import math
+import queue
+import logging
+import argparse
+import threading
+import socketserver
+from concurrent.futures import Future
+import numpy as np
+
+import semantic_engine
+from chatbot_logic import get_translation_batcher
+from inference_client import send_message, read_message
+from model_loader import startup_report
+
+logger = logging.getLogger(__name__)
+
+ENCODE_MAX_BATCH = int(os.environ.get("WELLBOT_ENCODE_MAX_BATCH", "64"))
+ENCODE_MAX_WAIT_MS = float(os.environ.get("WELLBOT_ENCODE_MAX_WAIT_MS", "3"))
+
+class EncodeBatcher:
+    """Merges concurrent encode requests into one model.encode call."""
+
+    def __init__(self, max_batch=ENCODE_MAX_BATCH, max_wait_ms=ENCODE_MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="encode-batcher", daemon=True).start()
+
+    def encode(self, texts):
+        future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            size = len(jobs[0][0])
+            while size < self.max_batch:
+                try:
+                    job = self._queue.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job[0])
+            texts = [text for job_texts, _ in jobs for text in job_texts]
+            try:
+                vectors = semantic_engine.encode_texts(texts)
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for job_texts, future in jobs:
+                future.set_result(vectors[offset:offset + len(job_texts)])
+                offset += len(job_texts)
+
+ENCODER = None
+
+def _jsonable(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def dispatch(request):
+    op = request.get("op")
+    if op == "encode":
+        return {"embeddings": ENCODER.encode(request["texts"]).tolist()}
+    if op == "search":
+        index = semantic_engine.get_dataset_index()
+        if index.df is None:
+            return {"rows": [], "scores": [], "index_key": None}
+        query = np.asarray(request["embedding"], dtype=np.float32)
+        k = int(request.get("k", 1))
+        if request.get("text") and hasattr(index.search, "search_text"):
+            indices, scores = index.search.search_text(request["text"], query, k)
+        else:
+            indices, scores = index.search.search(query, k)
+        rows = [{col: _jsonable(val) for col, val in index.df.iloc[int(i)].items()} for i in indices]
+        return {"rows": rows, "scores": [float(s) for s in scores], "index_key": index.key}
+    if op == "translate":
+        batcher = get_translation_batcher()
+        futures = [batcher.submit(text) for text in request["texts"]]
+        return {"translations": [f.result() for f in futures]}
+    if op == "info":
+        return {"index_key": semantic_engine.current_index_key(), "models": startup_report()}
+    return {"error": f"Unknown op '{op}'"}
+
+class InferenceHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = read_message(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                reply = dispatch(request)
+            except Exception as e:
+                logger.error(f"Inference request failed: {e}", exc_info=True)
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            try:
+                send_message(self.wfile, reply)
+            except OSError:
+                return
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def main():
+    global ENCODER
+    parser = argparse.ArgumentParser(description="WellBot shared inference server.")
+    parser.add_argument("--socket", help="Unix socket path to listen on.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-preload", action="store_true", help="Load models on first request instead of at startup.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    ENCODER = EncodeBatcher()
+    if not args.no_preload:
+        semantic_engine.get_dataset_index()
+        get_translation_batcher()
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixServer(args.socket, InferenceHandler)
+        logger.info(f"Inference server listening on unix:{args.socket}")
+    else:
+        server = TCPServer((args.host, args.port), InferenceHandler)
+        logger.info(f"Inference server listening on {args.host}:{args.port}")
+    with server:
+        server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import time
+import threading
+from collections import namedtuple
+from nlu_engine import PhraseMatcher, tokenize, longest_hits, HEALTH_KEYWORDS_HI
+
+# Phrases that pick a knowledge-base section.
+SECTION_CUES = {
+    "first aid": "first_aid", "treat": "first_aid", "treatment": "first_aid", "remedy": "first_aid",
+    "remedies": "first_aid", "what to do": "first_aid", "cure": "first_aid",
+    "symptom": "symptoms", "symptoms": "symptoms", "signs": "symptoms",
+    "prevent": "prevention", "prevention": "prevention", "avoid": "prevention",
+    "what is": "description", "meaning": "description",
+    "प्राथमिक उपचार": "first_aid", "इलाज": "first_aid", "उपचार": "first_aid", "क्या करें": "first_aid",
+    "लक्षण": "symptoms", "बचाव": "prevention", "रोकथाम": "prevention", "क्या है": "description",
+}
+
+# Words that may surround a condition without making the query more specific.
+FILLER_WORDS = {
+    "a", "an", "the", "for", "of", "to", "do", "i", "have", "has", "my", "me", "is", "are", "on",
+    "in", "how", "what", "with", "can", "should", "got", "please", "tell", "about", "it", "minor",
+    "का", "की", "के", "मुझे", "है", "हैं", "क्या", "में", "को", "से", "लिए", "करें", "कैसे", "हो",
+    "मेरा", "मेरी", "मेरे", "बताओ", "बताइए", "कृपया",
+}
+
+# Words that may also join the symptoms of a symptom-only query ("chills and sweating").
+SYMPTOM_FILLER_WORDS = FILLER_WORDS | {
+    "and", "or", "also", "some", "am", "feel", "feeling", "having", "had", "been", "since", "very",
+    "really", "bad", "mild", "slight", "bit", "little", "lot", "kid", "child", "son", "daughter",
+    "और", "भी", "रहा", "रही", "रहे",
+}
+
+Route = namedtuple("Route", "intent condition section")
+
+class IntentRouter:
+    """
+    Routes a query without any model inference, using one phrase trie built
+    from the greeting/farewell lists, the health keywords and section cues.
+    route() returns a Route for greetings, farewells and queries that are
+    only about a single knowledge-base condition, and None otherwise. Given
+    the knowledge base, it also routes queries that only list symptoms to
+    the condition they point to, and recompiles the trie when the knowledge
+    base has been reloaded with different conditions.
+    """
+
+    def __init__(self, config, kb):
+        self.config = config
+        self.version = kb.version
+        self.matcher = self._compile(kb.records)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "greeting": 0, "farewell": 0, "knowledge_base": 0, "symptoms": 0,
+                      "route_seconds": 0.0}
+
+    def _compile(self, conditions):
+        conditions = set(conditions)
+        matcher = PhraseMatcher()
+        for phrase in self.config["greetings_en"] + self.config["greetings_hi"]:
+            matcher.add(phrase, ("greeting", None))
+        for phrase in self.config["farewells_en"] + self.config["farewells_hi"]:
+            matcher.add(phrase, ("farewell", None))
+        for name in conditions:
+            matcher.add(name, ("condition", name))
+        for phrase, keyword in HEALTH_KEYWORDS_HI.items():
+            if keyword in conditions:
+                matcher.add(phrase, ("condition", keyword))
+        for phrase, section in SECTION_CUES.items():
+            matcher.add(phrase, ("section", section))
+        return matcher
+
+    def update(self, kb):
+        """Recompiles the trie for a new knowledge-base snapshot; the swap is one assignment."""
+        if kb.version != self.version:
+            matcher = self._compile(kb.records)
+            self.matcher, self.version = matcher, kb.version
+
+    def _symptom_route(self, tokens, kb):
+        """The single best-ranked condition when every other word is filler, else None."""
+        ranked, covered = kb.conditions_for_symptoms(tokens)
+        if not ranked or (len(ranked) > 1 and ranked[0][1] == ranked[1][1]):
+            return None
+        if any(i not in covered and token not in SYMPTOM_FILLER_WORDS for i, token in enumerate(tokens)):
+            return None
+        return Route("symptoms", ranked[0][0], None)
+
+    def _classify(self, text, kb=None):
+        tokens = tokenize(text)
+        hits = self.matcher.match(tokens)
+        kinds = {value[0] for value, _, _ in hits}
+        # Same precedence as before: any greeting, then any farewell.
+        if "greeting" in kinds:
+            return Route("greeting", None, None)
+        if "farewell" in kinds:
+            return Route("farewell", None, None)
+
+        hits = longest_hits(hits)
+        found = {value[1] for value, _, _ in hits if value[0] == "condition"}
+        if not found and kb is not None:
+            return self._symptom_route(tokens, kb)
+        if len(found) != 1:
+            return None
+        covered = set()
+        for _, start, end in hits:
+            covered.update(range(start, end))
+        if any(i not in covered and token not in FILLER_WORDS for i, token in enumerate(tokens)):
+            return None
+        sections = [value[1] for value, _, _ in hits if value[0] == "section"]
+        return Route("knowledge_base", found.pop(), sections[0] if sections else None)
+
+    def route(self, text, kb=None):
+        start = time.perf_counter()
+        if kb is not None:
+            self.update(kb)
+        route = self._classify(text, kb)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["route_seconds"] += elapsed
+            if route is not None:
+                self.stats[route.intent] += 1
+        return route
+
+    def fast_path_fraction(self):
+        with self._lock:
+            served = sum(self.stats[intent] for intent in ("greeting", "farewell", "knowledge_base", "symptoms"))
+            return served / self.stats["requests"] if self.stats["requests"] else 0.0
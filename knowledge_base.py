@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from nlu_engine import PhraseMatcher, tokenize, longest_hits, HEALTH_KEYWORDS_HI
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_BASE_PATH = "knowledge_base.json"
+SECTIONS = ("description", "symptoms", "first_aid", "prevention")
+SECTION_LABELS = {
+    "description": "About",
+    "symptoms": "Common symptoms",
+    "first_aid": "First aid",
+    "prevention": "Prevention",
+}
+# Seconds between stat() calls that look for a changed file.
+RELOAD_CHECK_INTERVAL = float(os.environ.get("WELLBOT_KB_RELOAD_INTERVAL", "5"))
+
+class ConditionRecord:
+    __slots__ = ("name", "description", "symptoms", "first_aid", "prevention")
+
+    def __init__(self, name, description, symptoms, first_aid, prevention):
+        self.name = name
+        self.description = description
+        self.symptoms = tuple(symptoms)
+        self.first_aid = first_aid
+        self.prevention = prevention
+
+    def section_text(self, section):
+        value = getattr(self, section)
+        return ", ".join(value) if isinstance(value, tuple) else value
+
+class KnowledgeBase:
+    """
+    Immutable snapshot of knowledge_base.json with inverted indexes from
+    condition names (English and Hindi) and symptom phrases to records, plus
+    lazily computed embeddings of every condition section.
+    """
+
+    def __init__(self, data, version):
+        self.version = version
+        self.records = {
+            name: ConditionRecord(name, entry["description"], entry["symptoms"],
+                                  entry["first_aid"], entry["prevention"])
+            for name, entry in data["conditions"].items()
+        }
+
+        self.by_name = {name: name for name in self.records}
+        for alias, name in HEALTH_KEYWORDS_HI.items():
+            if name in self.records:
+                self.by_name[alias] = name
+        self.by_symptom = {}
+        for record in self.records.values():
+            for symptom in record.symptoms:
+                self.by_symptom.setdefault(" ".join(tokenize(symptom)), set()).add(record.name)
+        self.symptom_matcher = PhraseMatcher()
+        for phrase in self.by_symptom:
+            self.symptom_matcher.add(phrase, phrase)
+
+        self.sections = [(name, section) for name in self.records for section in SECTIONS]
+        self._embeddings = None
+        self._embed_lock = threading.Lock()
+
+    def lookup(self, condition, section):
+        """Section text for a condition name or alias, or None."""
+        record = self.records.get(self.by_name.get(condition, condition))
+        if record is None:
+            return None
+        return record.section_text(section)
+
+    def conditions_for_symptoms(self, tokens):
+        """
+        Ranks conditions by the symptom phrases found in tokens. A phrase
+        shared by n conditions adds 1/n to each, so "sneezing" outweighs
+        "pain". Returns ([(condition, score)] best first, covered token positions).
+        """
+        scores, covered = {}, set()
+        for phrase, start, end in longest_hits(self.symptom_matcher.match(tokens)):
+            covered.update(range(start, end))
+            names = self.by_symptom[phrase]
+            for name in names:
+                scores[name] = scores.get(name, 0.0) + 1.0 / len(names)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True), covered
+
+    def section_embeddings(self, encode):
+        """Normalized embedding per (condition, section), computed once with encode(texts)."""
+        if self._embeddings is None:
+            with self._embed_lock:
+                if self._embeddings is None:
+                    texts = [
+                        f"{name} {SECTION_LABELS[section]}: {self.records[name].section_text(section)}"
+                        for name, section in self.sections
+                    ]
+                    self._embeddings = np.asarray(encode(texts), dtype=np.float32)
+        return self._embeddings
+
+    def search(self, query_embedding, encode):
+        """Best (condition, section, cosine score) for a normalized query embedding."""
+        scores = self.section_embeddings(encode) @ np.asarray(query_embedding, dtype=np.float32)
+        best = int(scores.argmax())
+        name, section = self.sections[best]
+        return name, section, float(scores[best])
+
+def _file_version(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_knowledge_base(path=KNOWLEDGE_BASE_PATH):
+    version = _file_version(path)
+    with open(path, encoding='utf-8') as f:
+        return KnowledgeBase(json.load(f), version)
+
+class KnowledgeBaseStore:
+    """
+    Serves the current KnowledgeBase snapshot. get() notices file changes
+    (checking at most every RELOAD_CHECK_INTERVAL seconds) and rebuilds the
+    snapshot on a background thread; callers keep getting the old snapshot
+    until the new one is swapped in with a single reference assignment.
+    """
+
+    def __init__(self, path=KNOWLEDGE_BASE_PATH, encode=None):
+        self.path = path
+        self.encode = encode
+        self._current = load_knowledge_base(path)
+        self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+        self._reloading = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._maybe_reload(now)
+        return self._current
+
+    def _maybe_reload(self, now):
+        with self._lock:
+            if self._reloading or now < self._next_check:
+                return
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            try:
+                changed = _file_version(self.path) != self._current.version
+            except OSError:
+                return
+            if not changed:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="kb-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            snapshot = load_knowledge_base(self.path)
+            if self.encode is not None and self._current._embeddings is not None:
+                # Embeddings were in use, so build them before the swap.
+                snapshot.section_embeddings(self.encode)
+            self._current = snapshot
+            logger.info(f"Reloaded {self.path} ({len(snapshot.records)} conditions).")
+        except Exception as e:
+            logger.error(f"Could not reload {self.path}: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._reloading = False
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+from nlu_engine import tokenize
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Terms found in more than this share of rows are skipped when the query has
+# a rarer term: they barely change the ranking but dominate the postings scanned.
+MAX_DF_FRACTION = float(os.environ.get("WELLBOT_LEXICAL_MAX_DF", "0.25"))
+
+class BM25Index:
+    """
+    Okapi BM25 over a list of texts, stored as one CSR-style postings array
+    (row ids and precomputed per-posting weights, grouped by term). A query
+    only touches the postings of its own terms.
+    """
+
+    def __init__(self, texts):
+        vocab = {}
+        term_ids, doc_ids, lengths = [], [], np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(str(text).lower())
+            lengths[row] = len(tokens)
+            for token in tokens:
+                term_ids.append(vocab.setdefault(token, len(vocab)))
+                doc_ids.append(row)
+        self.vocab = vocab
+        self.n_rows = len(texts)
+
+        terms = np.asarray(term_ids, dtype=np.int64)
+        docs = np.asarray(doc_ids, dtype=np.int64)
+        # Collapse repeated (term, row) pairs into term frequencies.
+        pairs, tf = np.unique(terms * max(1, self.n_rows) + docs, return_counts=True)
+        terms, docs = pairs // max(1, self.n_rows), pairs % max(1, self.n_rows)
+
+        self.df = np.bincount(terms, minlength=len(vocab))
+        self.offsets = np.concatenate([[0], np.cumsum(self.df)])
+        idf = np.log(1 + (self.n_rows - self.df + 0.5) / (self.df + 0.5)).astype(np.float32)
+        avg_length = lengths.mean() if self.n_rows else 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / max(avg_length, 1e-9))
+        self.postings = docs.astype(np.int32)
+        self.weights = (idf[terms] * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+
+    def query_terms(self, text):
+        """Vocabulary ids of the distinct query tokens, without overly common terms if possible."""
+        ids = {self.vocab[t] for t in tokenize(text.lower()) if t in self.vocab}
+        rare = {i for i in ids if self.df[i] <= MAX_DF_FRACTION * self.n_rows}
+        return sorted(rare or ids)
+
+    def top(self, text, n):
+        """(row ids, BM25 scores) of up to n best-scoring rows sharing a term with text."""
+        terms = self.query_terms(text)
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        docs = np.concatenate([self.postings[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        weights = np.concatenate([self.weights[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        rows, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights).astype(np.float32)
+        if len(rows) > n:
+            keep = np.argpartition(-scores, n - 1)[:n]
+            rows, scores = rows[keep], scores[keep]
+        return rows.astype(np.int64), scores
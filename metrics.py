@@ -0,0 +1,189 @@
+"""
+In-process latency histograms and counters for the chat pipeline.
+
+Enabled with WELLBOT_METRICS=1; the setting is read once at import. When
+disabled, timed() returns the function unchanged, stage() returns a shared
+no-op context manager and inc()/observe() return immediately, so the hooks
+cost a global lookup at most.
+"""
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+
+ENABLED = os.environ.get("WELLBOT_METRICS", "0") == "1"
+METRICS_DIR = os.environ.get("WELLBOT_METRICS_DIR", "metrics")
+# Seconds between dumps of the Prometheus/JSON files; 0 dumps only at exit.
+DUMP_INTERVAL = float(os.environ.get("WELLBOT_METRICS_DUMP_INTERVAL", "60"))
+
+# Upper bounds in seconds, from sub-millisecond lookups to slow model calls.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SCORE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+_NULL_STAGE = nullcontext()
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout, plus count and sum."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+def observe(name, value, buckets=LATENCY_BUCKETS):
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+def inc(name, amount=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            inc(f"{self.name}.errors")
+        return False
+
+def stage(name):
+    """Context manager recording the block's wall time under name."""
+    return _Stage(name) if ENABLED else _NULL_STAGE
+
+def timed(name):
+    """Decorator recording each call's wall time under name."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def snapshot():
+    """All counters and histograms as plain data."""
+    with _lock:
+        return {
+            "enabled": ENABLED,
+            "pid": os.getpid(),
+            "timestamp": time.time(),
+            "counters": dict(_counters),
+            "histograms": {name: h.snapshot() for name, h in _histograms.items()},
+        }
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+def _metric_name(name):
+    return "wellbot_" + "".join(c if c.isalnum() else "_" for c in name)
+
+def prometheus_text(data=None):
+    """Snapshot in the Prometheus text exposition format."""
+    data = data or snapshot()
+    lines = []
+    for name, value in sorted(data["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, h in sorted(data["histograms"].items()):
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, n in h["buckets"].items():
+            cumulative += n
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines += [f"{metric}_sum {h['sum']}", f"{metric}_count {h['count']}"]
+    return "\n".join(lines) + "\n"
+
+def dump(directory=METRICS_DIR):
+    """Writes wellbot-<pid>.prom and wellbot-<pid>.json; returns the two paths."""
+    data = snapshot()
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"wellbot-{data['pid']}")
+    paths = []
+    for suffix, text in ((".prom", prometheus_text(data)), (".json", json.dumps(data, indent=2))):
+        # A temporary file per write: the dump thread, the atexit hook and the
+        # metrics page can all dump at once in the same process.
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(base) + suffix + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding='utf-8') as f:
+                f.write(text)
+            # mkstemp creates the file owner-only; scrapers may run as another user.
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, base + suffix)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        paths.append(base + suffix)
+    return paths
+
+def _dump_loop():
+    while True:
+        time.sleep(DUMP_INTERVAL)
+        try:
+            dump()
+        except OSError:
+            pass
+
+if ENABLED:
+    atexit.register(dump)
+    if DUMP_INTERVAL > 0:
+        threading.Thread(target=_dump_loop, name="metrics-dump", daemon=True).start()
@@ -0,0 +1,144 @@
+import os
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Modules that define LazyModel handles; imported by the warm-up thread.
+MODEL_MODULES = ("semantic_engine", "chatbot_logic")
+
+# --- CPU inference settings ---
+# "int8" applies dynamic int8 quantization to the Linear layers of the torch models.
+QUANTIZE = os.environ.get("WELLBOT_QUANTIZE", "")
+# 0 keeps torch's defaults.
+TORCH_THREADS = int(os.environ.get("WELLBOT_TORCH_THREADS", "0"))
+TORCH_INTEROP_THREADS = int(os.environ.get("WELLBOT_TORCH_INTEROP_THREADS", "0"))
+
+_REGISTRY = {}
+_torch_configured = False
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class LazyModel:
+    """
+    Process-wide handle for a heavy model. The loader runs on the first get()
+    from any thread; load time and RSS growth are recorded for startup_report().
+    """
+
+    def __init__(self, name, loader, warm=True):
+        self.name = name
+        self.warm = warm
+        self._loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds = None
+        self.rss_delta_mb = None
+        _REGISTRY[name] = self
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                self._value = self._loader()
+                self.load_seconds = time.perf_counter() - start
+                self.rss_delta_mb = current_rss_mb() - rss_before
+                self._loaded = True
+                logger.info(f"Loaded {self.name} in {self.load_seconds:.2f}s (+{self.rss_delta_mb:.0f} MB RSS)")
+        return self._value
+
+    def override(self, value):
+        """Serves value instead of calling the loader (stub models for offline benchmarks)."""
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self.load_seconds = 0.0
+            self.rss_delta_mb = 0.0
+
+def configure_torch():
+    """Applies the torch thread settings once per process, before the first model runs."""
+    global _torch_configured
+    if _torch_configured:
+        return
+    _torch_configured = True
+    import torch
+    if TORCH_THREADS > 0:
+        torch.set_num_threads(TORCH_THREADS)
+    if TORCH_INTEROP_THREADS > 0:
+        try:
+            torch.set_num_interop_threads(TORCH_INTEROP_THREADS)
+        except RuntimeError as e:
+            # Only allowed before any inter-op parallel work has started.
+            logger.warning(f"Could not set torch inter-op threads: {e}")
+
+def quantize_model(model, mode=None):
+    """Returns model with int8 dynamic quantization of its Linear layers if enabled."""
+    mode = QUANTIZE if mode is None else mode
+    if not mode:
+        return model
+    if mode != "int8":
+        raise ValueError(f"Unknown quantization mode '{mode}'. Use 'int8' or leave it empty.")
+    import torch
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def model_version(name, mode=None):
+    """Identifies outputs of model name for caching; quantized weights get their own version."""
+    mode = QUANTIZE if mode is None else mode
+    return f"{name}+{mode}" if mode else name
+
+def startup_report():
+    """Per-model load status, load time and RSS delta."""
+    return [
+        {
+            "model": handle.name,
+            "loaded": handle.loaded,
+            "load_seconds": handle.load_seconds,
+            "rss_delta_mb": handle.rss_delta_mb,
+        }
+        for handle in _REGISTRY.values()
+    ]
+
+def _warm_up():
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+    for handle in list(_REGISTRY.values()):
+        if handle.warm:
+            try:
+                handle.get()
+            except Exception as e:
+                logger.error(f"Warm-up of {handle.name} failed: {e}", exc_info=True)
+
+def start_background_warmup():
+    """Loads every warm model on a daemon thread. Safe to call on every rerun."""
+    global _warmup_started
+    with _warmup_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    threading.Thread(target=_warm_up, name="model-warmup", daemon=True).start()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    _warm_up()
+    for entry in startup_report():
+        print(entry)
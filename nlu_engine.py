@@ -1,25 +1,80 @@
-import spacy
-
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print(
-        "Spacy model 'en_core_web_sm' not found. "
-        "Please run 'python -m spacy download en_core_web_sm' in your terminal."
-    )
-    nlp = None
+import re
 
 HEALTH_KEYWORDS = [
     "headache", "fever", "cold", "flu", "cough", "cut", "burn", "sprain",
     "stomach", "pain", "ache"
 ]
 
-def extract_health_entities(text):
-    if not nlp:
-        return []
-    doc = nlp(text.lower())
-    entities = set()
+# Hindi surface forms of the keywords above.
+HEALTH_KEYWORDS_HI = {
+    "सिरदर्द": "headache", "सिर दर्द": "headache",
+    "बुखार": "fever", "बुख़ार": "fever", "ज्वर": "fever",
+    "सर्दी": "cold", "जुकाम": "cold", "ज़ुकाम": "cold",
+    "फ्लू": "flu", "खांसी": "cough", "खाँसी": "cough",
+    "कट": "cut", "घाव": "cut", "जलना": "burn", "जल गया": "burn", "जल गई": "burn",
+    "मोच": "sprain", "पेट": "stomach", "दर्द": "pain",
+}
+
+# Latin word characters plus Devanagari letters and vowel signs, excluding the danda punctuation.
+_TOKEN_RE = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+class PhraseMatcher:
+    """
+    Token-level trie over multi-word phrases. match() walks the trie from
+    every token position and returns each (value, start, end) hit, so
+    "cut" matches "a deep cut" but not "cute".
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.max_len = 0
+
+    def add(self, phrase, value):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(None, []).append(value)
+        self.max_len = max(self.max_len, len(tokens))
+
+    def match(self, tokens):
+        hits = []
+        for start in range(len(tokens)):
+            node = self._root
+            for end in range(start, min(len(tokens), start + self.max_len)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                for value in node.get(None, ()):
+                    hits.append((value, start, end + 1))
+        return hits
+
+def longest_hits(hits):
+    """Drops hits nested inside a longer hit ("सिर दर्द" wins over "दर्द")."""
+    hits = sorted(hits, key=lambda h: (h[1], -(h[2] - h[1])))
+    kept, covered_to = [], -1
+    for hit in hits:
+        if hit[2] <= covered_to:
+            continue
+        kept.append(hit)
+        covered_to = max(covered_to, hit[2])
+    return kept
+
+def _build_keyword_matcher():
+    matcher = PhraseMatcher()
     for keyword in HEALTH_KEYWORDS:
-        if keyword in text.lower():
-            entities.add(keyword)
-    return list(entities)
\ No newline at end of file
+        matcher.add(keyword, keyword)
+    for phrase, keyword in HEALTH_KEYWORDS_HI.items():
+        matcher.add(phrase, keyword)
+    return matcher
+
+KEYWORD_MATCHER = _build_keyword_matcher()
+
+def extract_health_entities(text):
+    """Health keywords mentioned in text (English or Hindi), as English keywords."""
+    return list({value for value, _, _ in KEYWORD_MATCHER.match(tokenize(text))})
@@ -1,5 +1,11 @@
 import streamlit as st
-from chatbot_logic import get_bot_response, CONFIG 
+from collections import deque
+from chatbot_logic import get_bot_response, CONFIG
+from db_functions import add_messages, get_messages
+
+# Messages kept in memory and rendered by default, and messages fetched per "load older" click.
+CHAT_WINDOW = 30
+CHAT_PAGE_SIZE = 20
 
 if not st.session_state.get('logged_in', False):
     st.warning("Please log in to start a chat.")
@@ -14,20 +20,38 @@ with st.sidebar:
 
 st.title("💬 Global Wellness Chatbot")
 # --- UPDATED INFO TEXT ---
-st.info("आप अंग्रेज़ी या हिंदी में पूछ सकते हैं। (You can ask in English or Hindi.)", icon="🌐")
+st.info("आप अंग्रेज़ी या हिंदी में पूछ सकते हैं। (You can ask in English or Hindi.)", icon="🌐")
+
+user_id = st.session_state['user_id']
 
 if "messages" not in st.session_state:
-    # --- UPDATED WELCOME MESSAGE ---
-    st.session_state.messages = [
-        {"role": "assistant", "content": CONFIG["responses"]["greeting_en"]}
-    ]
+    # Bounded ring of the most recent turns, seeded from the stored history.
+    st.session_state.messages = deque(get_messages(user_id, CHAT_WINDOW), maxlen=CHAT_WINDOW)
+    st.session_state.older_pages = 0
+    if not st.session_state.messages:
+        # --- UPDATED WELCOME MESSAGE ---
+        st.session_state.messages.append({"role": "assistant", "content": CONFIG["responses"]["greeting_en"]})
+
+# Older turns are read from SQLite on demand instead of being held in the session.
+oldest = next((m for m in st.session_state.messages if "id" in m), None)
+if oldest is not None:
+    older = []
+    if st.session_state.older_pages:
+        older = get_messages(user_id, st.session_state.older_pages * CHAT_PAGE_SIZE, before=oldest)
+    has_more = bool(get_messages(user_id, 1, before=older[0] if older else oldest))
+    if has_more and st.button("⬆️ Load older messages"):
+        st.session_state.older_pages += 1
+        st.rerun()
+    for message in older:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
 
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
 if prompt := st.chat_input("Ask about a health condition..."):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    user_message = {"role": "user", "content": prompt}
     with st.chat_message("user"):
         st.markdown(prompt)
 
@@ -35,5 +59,7 @@ if prompt := st.chat_input("Ask about a health condition..."):
         with st.spinner("Thinking..."):
             bot_response = get_bot_response(prompt)
         st.markdown(bot_response)
-    
-    st.session_state.messages.append({"role": "assistant", "content": bot_response})
\ No newline at end of file
+
+    # Persist the turn as one batch, then keep it in the bounded ring.
+    turn = add_messages(user_id, [user_message, {"role": "assistant", "content": bot_response}])
+    st.session_state.messages.extend(turn)
@@ -0,0 +1,96 @@
+import os
+import json
+import streamlit as st
+import pandas as pd
+import metrics
+from chatbot_logic import ROUTER, get_response_cache
+from db_functions import profile_cache_stats
+from model_loader import startup_report
+
+# Comma-separated user ids allowed to open this page.
+ADMIN_USER_IDS = {int(x) for x in os.environ.get("WELLBOT_ADMIN_USER_IDS", "").split(",") if x.strip()}
+
+if not st.session_state.get('logged_in', False):
+    st.warning("Please log in to view metrics.")
+    st.stop()
+
+if st.session_state['user_id'] not in ADMIN_USER_IDS:
+    st.warning("This page is only available to administrators.")
+    st.stop()
+
+with st.sidebar:
+    st.title("Navigation")
+    if st.button("Log Out"):
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+        st.rerun()
+
+st.title("📈 Pipeline Metrics")
+st.markdown("---")
+
+if not metrics.ENABLED:
+    st.info("Stage timings are off. Start the app with WELLBOT_METRICS=1 to collect them.")
+
+data = metrics.snapshot()
+counters = data["counters"]
+
+# --- Headline numbers ---
+requests = counters.get("chat.requests", 0)
+lookups = sum(counters.get(f"chat.cache.{k}", 0) for k in ("exact_hits", "semantic_hits", "misses"))
+hits = counters.get("chat.cache.exact_hits", 0) + counters.get("chat.cache.semantic_hits", 0)
+answered = sum(counters.get(f"chat.source.{k}", 0) for k in ("dataset", "knowledge_base", "fallback"))
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Chat requests", requests)
+col2.metric("Response cache hit rate", f"{hits / lookups:.0%}" if lookups else "n/a")
+col3.metric("Fallback rate", f"{counters.get('chat.source.fallback', 0) / answered:.0%}" if answered else "n/a")
+col4.metric("Router fast path", f"{ROUTER.fast_path_fraction():.0%}")
+
+# --- Stage latencies ---
+st.subheader("Stage latencies")
+timings = {name: h for name, h in data["histograms"].items() if "similarity_score" not in name}
+if timings:
+    rows = [
+        {"stage": name, "count": h["count"], "mean_ms": 1000 * h["sum"] / h["count"] if h["count"] else None,
+         "p50_ms": 1000 * h["p50"] if h["p50"] is not None else None,
+         "p95_ms": 1000 * h["p95"] if h["p95"] is not None else None,
+         "p99_ms": 1000 * h["p99"] if h["p99"] is not None else None}
+        for name, h in sorted(timings.items())
+    ]
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+    st.caption("Percentiles are the upper bound of the histogram bucket they fall in.")
+else:
+    st.caption("No timings recorded yet.")
+
+# --- Similarity scores ---
+st.subheader("Similarity score distribution")
+for name in ("chat.similarity_score", "chat.kb_similarity_score"):
+    histogram = data["histograms"].get(name)
+    if histogram:
+        st.caption(name)
+        st.bar_chart(pd.Series(histogram["buckets"], name="queries"))
+
+# --- Counters and caches ---
+st.subheader("Counters")
+if counters:
+    st.dataframe(pd.DataFrame(sorted(counters.items()), columns=["counter", "value"]), hide_index=True)
+col1, col2 = st.columns(2)
+with col1:
+    st.caption("Response cache")
+    st.json(get_response_cache().stats())
+with col2:
+    st.caption("Profile cache")
+    st.json(profile_cache_stats())
+st.caption("Models")
+st.dataframe(pd.DataFrame(startup_report()), hide_index=True)
+
+# --- Export ---
+st.subheader("Export")
+col1, col2, col3 = st.columns(3)
+col1.download_button("Prometheus text", metrics.prometheus_text(data), file_name="wellbot.prom")
+col2.download_button("JSON", json.dumps(data, indent=2), file_name="wellbot.json")
+if col3.button("Write dump files"):
+    paths = metrics.dump()
+    st.success("Wrote " + ", ".join(paths))
+if st.button("Reset metrics"):
+    metrics.reset()
+    st.rerun()
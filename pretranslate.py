@@ -0,0 +1,60 @@
+"""
+Offline job: translates every possible English reply to Hindi once and stores
+it in the translations table of healthbot.sqlite.
+
+    python pretranslate.py [--batch-size 16]
+
+Covers each dataset answer exactly as get_bot_response composes it (answer,
+source line and disclaimer), the fallback reply, the static CONFIG responses
+and every knowledge-base reply the router can produce. Rows already translated with the current model are skipped.
+"""
+import argparse
+from db_functions import init_db, get_translated_hashes, save_translations
+from semantic_engine import load_dataset
+from knowledge_base import SECTIONS
+from translation_memory import TranslationMemory
+from chatbot_logic import (CONFIG, KNOWLEDGE_BASE, EN_HI_MODEL_VERSION, SEGMENT_TRANSLATION, TRANSLATION_MEMORY,
+                           compose_response_en, compose_kb_response_en, text_hash, translate_offline)
+
+
+def collect_sources():
+    sources = [compose_response_en(None)]
+    sources += [text for key, text in CONFIG["responses"].items() if key.endswith("_en")]
+    for condition in KNOWLEDGE_BASE.get().records:
+        sources += [compose_kb_response_en(condition, section) for section in (None, *SECTIONS)]
+    df = load_dataset()
+    if df is not None:
+        sources += [compose_response_en(row) for _, row in df.iterrows()]
+    # Keep order, drop duplicates.
+    return list(dict.fromkeys(sources))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-translate dataset answers to Hindi.")
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+    done = get_translated_hashes(EN_HI_MODEL_VERSION)
+    pending = [text for text in collect_sources() if text_hash(text) not in done]
+    print(f"{len(pending)} texts to translate ({len(done)} already stored).")
+
+    memory = TranslationMemory(EN_HI_MODEL_VERSION, lambda texts: translate_offline(texts, args.batch_size),
+                               TRANSLATION_MEMORY.reference)
+    for start in range(0, len(pending), args.batch_size):
+        batch = pending[start:start + args.batch_size]
+        if SEGMENT_TRANSLATION:
+            # Stores every sentence as well as the whole reply, so live replies reuse them.
+            memory.translate_texts(batch)
+        else:
+            translated = translate_offline(batch, args.batch_size)
+            save_translations([
+                (text_hash(src), EN_HI_MODEL_VERSION, src, dst) for src, dst in zip(batch, translated)
+            ])
+        print(f"  {min(start + args.batch_size, len(pending))}/{len(pending)}")
+    if SEGMENT_TRANSLATION:
+        print(f"Translation memory: {memory.report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("WELLBOT_RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL = float(os.environ.get("WELLBOT_RESPONSE_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_SIZE = int(os.environ.get("WELLBOT_SEMANTIC_CACHE_SIZE", "256"))
+# Cosine distance (1 - similarity) under which two queries share a response.
+SEMANTIC_CACHE_MAX_DISTANCE = float(os.environ.get("WELLBOT_SEMANTIC_CACHE_MAX_DISTANCE", "0.05"))
+
+def normalize_query(text):
+    """Lowercases, collapses whitespace and strips surrounding punctuation."""
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    return text.strip(" ?!.,;:।")
+
+class ResponseCache:
+    """
+    Two-tier cache of final bot responses.
+    Tier one is an LRU keyed by (normalized text, language). Tier two keeps
+    the embeddings of recent queries in a fixed-size matrix and serves a
+    stored response when a new query is within max_distance of one of them.
+    Both tiers expire entries after ttl seconds and are cleared whenever the
+    dataset index key changes.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL,
+                 semantic_entries=SEMANTIC_CACHE_SIZE, max_distance=SEMANTIC_CACHE_MAX_DISTANCE):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_entries = semantic_entries
+        self.max_distance = max_distance
+        self.version = None
+        self._lock = threading.Lock()
+        self._exact = OrderedDict()
+        self._vectors = None
+        self._slots = [None] * semantic_entries
+        self._next_slot = 0
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def ensure_version(self, version):
+        """Drops every entry if the dataset/model version changed."""
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.counters["invalidations"] += 1
+                self._clear()
+                self.version = version
+
+    def _clear(self):
+        self._exact.clear()
+        self._vectors = None
+        self._slots = [None] * self.semantic_entries
+        self._next_slot = 0
+
+    def get(self, text, lang):
+        """Tier one lookup. Returns the cached response or None."""
+        key = (normalize_query(text), lang)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is not None:
+                expires, response = entry
+                if expires > now:
+                    self._exact.move_to_end(key)
+                    self.counters["exact_hits"] += 1
+                    return response
+                del self._exact[key]
+        return None
+
+    def get_similar(self, query_vec, lang):
+        """Tier two lookup by normalized query embedding. Counts a miss when nothing matches."""
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is not None:
+                similarities = self._vectors @ np.asarray(query_vec, dtype=np.float32)
+                for slot in np.argsort(-similarities):
+                    if 1.0 - similarities[slot] > self.max_distance:
+                        break
+                    entry = self._slots[slot]
+                    if entry is not None and entry[0] == lang and entry[1] > now:
+                        self.counters["semantic_hits"] += 1
+                        return entry[2]
+            self.counters["misses"] += 1
+        return None
+
+    def put(self, text, lang, query_vec, response):
+        expires = time.monotonic() + self.ttl
+        key = (normalize_query(text), lang)
+        with self._lock:
+            self._exact[key] = (expires, response)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+                self.counters["evictions"] += 1
+
+            if query_vec is None or self.semantic_entries <= 0:
+                return
+            query_vec = np.asarray(query_vec, dtype=np.float32)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.semantic_entries, query_vec.shape[0]), dtype=np.float32)
+            # Ring buffer: the oldest semantic entry is overwritten first.
+            slot = self._next_slot
+            self._vectors[slot] = query_vec
+            self._slots[slot] = (lang, expires, response)
+            self._next_slot = (slot + 1) % self.semantic_entries
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["exact_hits"] + self.counters["semantic_hits"] + self.counters["misses"]
+            return dict(self.counters, entries=len(self._exact),
+                        hit_rate=(lookups - self.counters["misses"]) / lookups if lookups else 0.0)
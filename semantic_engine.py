@@ -1,58 +1,616 @@
+import os
+import json
+import time
+import logging
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
+import numpy as np
 import streamlit as st
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
+from model_loader import LazyModel, configure_torch, quantize_model, model_version
+from lexical_index import BM25Index
+import metrics
+from inference_client import get_client, mark_unavailable, InferenceUnavailable, CLIENT_MODE
+
+DATASET_PATH = "health_dataset.csv"
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+# Embeddings of the int8 model are not interchangeable with float32 ones.
+MODEL_VERSION = model_version(MODEL_NAME)
+INDEX_DIR = "embedding_index"
+SIMILARITY_THRESHOLD = 0.5
+# "exact" or "ivf"; the approximate backend only pays off on very large corpora.
+INDEX_BACKEND = os.environ.get("WELLBOT_INDEX_BACKEND", "exact")
+ENCODE_BATCH_SIZE = int(os.environ.get("WELLBOT_ENCODE_BATCH_SIZE", "256"))
+# "float32" scans the memory-mapped matrix; "float16" or "int8" scan a compact
+# in-memory copy and re-score the best RESCORE_CANDIDATES rows in float32.
+INDEX_DTYPE = os.environ.get("WELLBOT_INDEX_DTYPE", "float32")
+RESCORE_CANDIDATES = int(os.environ.get("WELLBOT_RESCORE_CANDIDATES", "32"))
+# With WELLBOT_LEXICAL_PREFILTER=1, BM25 picks LEXICAL_CANDIDATES questions
+# and only those are compared with the query embedding.
+LEXICAL_PREFILTER = os.environ.get("WELLBOT_LEXICAL_PREFILTER", "0") == "1"
+LEXICAL_CANDIDATES = int(os.environ.get("WELLBOT_LEXICAL_CANDIDATES", "300"))
+
+logger = logging.getLogger(__name__)
+
+def _load_sentence_transformer(quantize=None):
+    from sentence_transformers import SentenceTransformer
+    configure_torch()
+    return quantize_model(SentenceTransformer(MODEL_NAME), quantize)
+
+# With a shared inference server the model is only a fallback, so it is not warmed up.
+SEMANTIC_MODEL = LazyModel("sentence_transformer", _load_sentence_transformer, warm=not CLIENT_MODE)
 
 # --- Model and Data loading functions remain cached ---
-@st.cache_resource
 def load_semantic_model():
-    model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
-    return model
+    return SEMANTIC_MODEL.get()
 
-@st.cache_data
-def load_and_embed_dataset(_model):
+def load_dataset():
+    """Reads the CSV and normalizes its columns. Returns None on any problem."""
     try:
-        df = pd.read_csv("health_dataset.csv", encoding='utf-8-sig')
+        df = pd.read_csv(DATASET_PATH, encoding='utf-8-sig')
     except FileNotFoundError:
         st.error("health_dataset.csv not found!")
-        return None, None
+        return None
     except Exception as e:
         st.error(f"Error loading CSV: {e}")
-        return None, None
+        return None
 
     if df.empty or len(df.columns) == 0:
         st.error("CSV is empty or has no columns.")
-        return None, None
+        return None
 
     first_column_name = df.columns[0]
     if 'answer' not in df.columns:
         st.error("CSV must have an 'answer' column.")
-        return None, None
+        return None
+
+    return df.rename(columns={first_column_name: 'question'})
+
+# --- Persistent embedding index ---
+def dataset_hash(path=DATASET_PATH):
+    """SHA-256 of the raw CSV bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def index_key(csv_hash, model_name=MODEL_VERSION):
+    """Identifies an index file by dataset content and embedding model version."""
+    return hashlib.sha256(f"{csv_hash}:{model_name}".encode('utf-8')).hexdigest()[:16]
+
+def _index_paths(key):
+    base = os.path.join(INDEX_DIR, key)
+    return base + ".npy", base + ".json", base + ".rows.npy"
+
+def _latest_path():
+    return os.path.join(INDEX_DIR, "latest.json")
+
+def _read_latest():
+    """Key of the most recently built index, or None."""
+    try:
+        with open(_latest_path(), encoding='utf-8') as f:
+            return json.load(f)["key"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _replace_atomic(path, write):
+    """
+    Writes path through a temporary file unique to this writer, then renames
+    it into place, so concurrent builders of the same index never share or
+    remove each other's temporary file; the last rename wins.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def _write_json_atomic(path, payload):
+    _replace_atomic(path, lambda f: f.write(json.dumps(payload).encode('utf-8')))
+
+def _write_npy_atomic(path, array):
+    _replace_atomic(path, lambda f: np.save(f, array))
+
+def row_hashes(questions):
+    """64-bit BLAKE2b digest per question; equal digests mean the embedding can be reused."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(q).encode('utf-8'), digest_size=8).digest(), 'little')
+         for q in questions),
+        dtype=np.uint64, count=len(questions),
+    )
+
+def _load_previous(previous_key):
+    """(embeddings, row hashes) of an earlier index built with the same model, or None."""
+    if previous_key is None:
+        return None
+    npy_path, meta_path, rows_path = _index_paths(previous_key)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("model") != MODEL_VERSION:
+            return None
+        return np.load(npy_path, mmap_mode='r'), np.load(rows_path)
+    except (OSError, ValueError):
+        return None
+
+def _prune_indexes(key, previous_key):
+    """
+    Removes index files last written before the previous latest index.
+    Anything newer may still be the previous_key of another worker or
+    another builder's output, and temporary files belong to writes in
+    progress, so both are left alone.
+    """
+    if previous_key is None:
+        return
+    try:
+        cutoff = os.path.getmtime(_index_paths(previous_key)[1])
+    except OSError:
+        return
+    for name in os.listdir(INDEX_DIR):
+        if name.endswith(".tmp") or name.split(".", 1)[0] in ("latest", key, previous_key):
+            continue
+        path = os.path.join(INDEX_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def build_embedding_index(model, df, key, previous_key=None):
+    """
+    Writes the normalized float32 question embeddings for df to disk, with a
+    per-row hash array and a JSON metadata sidecar. Rows whose question is
+    unchanged since the index previous_key are copied from it; only new or
+    edited questions are encoded, ENCODE_BATCH_SIZE at a time. Deleted rows
+    simply do not appear in the new matrix. Files are written under temporary
+    names and renamed, so readers never see a partial index.
+    """
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    npy_path, meta_path, rows_path = _index_paths(key)
+    questions = df['question'].tolist()
+    hashes = row_hashes(questions)
+
+    source = np.full(len(questions), -1, dtype=np.int64)
+    previous = _load_previous(previous_key)
+    if previous is not None and len(previous[1]):
+        prev_embeddings, prev_hashes = previous
+        order = np.argsort(prev_hashes)
+        positions = np.minimum(np.searchsorted(prev_hashes[order], hashes), len(order) - 1)
+        found = prev_hashes[order][positions] == hashes
+        source[found] = order[positions][found]
+
+    missing = np.flatnonzero(source < 0)
+    encoded = []
+    for start in range(0, len(missing), ENCODE_BATCH_SIZE):
+        batch = [questions[i] for i in missing[start:start + ENCODE_BATCH_SIZE]]
+        encoded.append(model.encode(batch, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32))
+
+    dim = previous[0].shape[1] if previous is not None else encoded[0].shape[1]
+    embeddings = np.empty((len(questions), dim), dtype=np.float32)
+    reused = source >= 0
+    if reused.any():
+        embeddings[reused] = previous[0][source[reused]]
+    if encoded:
+        embeddings[missing] = np.concatenate(encoded)
+
+    _write_npy_atomic(npy_path, embeddings)
+    _write_npy_atomic(rows_path, hashes)
+    meta = {
+        "key": key,
+        "model": MODEL_VERSION,
+        "rows": int(embeddings.shape[0]),
+        "dim": int(embeddings.shape[1]),
+        "columns": list(df.columns),
+        "reused": int(reused.sum()),
+        "encoded": int(len(missing)),
+    }
+    _write_json_atomic(meta_path, meta)
+    _write_json_atomic(_latest_path(), {"key": key})
+    _prune_indexes(key, previous_key)
+    logger.info(f"Built index {key}: {meta['encoded']} rows encoded, {meta['reused']} reused.")
+    return meta
+
+def load_embedding_index(key, expected_rows):
+    """Memory-maps a previously built index, or returns None if it is missing or stale."""
+    npy_path, meta_path, _ = _index_paths(key)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        embeddings = np.load(npy_path, mmap_mode='r')
+    except (FileNotFoundError, ValueError, json.JSONDecodeError):
+        return None
+    if meta.get("model") != MODEL_VERSION or embeddings.shape[0] != expected_rows:
+        return None
+    return embeddings
+
+def _dataset_signature():
+    """Cheap stat-based signature used to decide when to re-hash the CSV."""
+    try:
+        stat = os.stat(DATASET_PATH)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+# --- Active index ---
+# The dataframe, its memory-mapped embeddings and the search structure are
+# swapped together as one immutable tuple. When the CSV changes, a background
+# thread builds the next index incrementally while the current one keeps
+# serving; the first load is the only one a request ever waits for.
+DatasetIndex = namedtuple("DatasetIndex", "signature df embeddings key search")
+
+_active = None
+_active_lock = threading.Lock()
+_rebuild_thread = None
+
+def _open_index(signature):
+    df = load_dataset()
+    if df is None:
+        return DatasetIndex(signature, None, None, None, None)
+    key = index_key(dataset_hash())
+    embeddings = load_embedding_index(key, len(df))
+    if embeddings is None:
+        build_embedding_index(load_semantic_model(), df, key, previous_key=_read_latest())
+        embeddings = load_embedding_index(key, len(df))
+    search = build_search_index(embeddings, questions=df['question'].astype(str).tolist())
+    return DatasetIndex(signature, df, embeddings, key, search)
+
+def _rebuild(signature):
+    global _active
+    try:
+        index = _open_index(signature)
+    except Exception as e:
+        logger.error(f"Index rebuild failed: {e}", exc_info=True)
+        index = None
+    if index is None or index.df is None:
+        # Keep serving the last good index until the CSV changes again.
+        _active = _active._replace(signature=signature)
+    else:
+        _active = index
+
+def get_dataset_index():
+    """Current DatasetIndex; triggers a background rebuild if the CSV changed."""
+    global _active, _rebuild_thread
+    signature = _dataset_signature()
+    active = _active
+    if active is not None and active.signature == signature:
+        return active
+    with _active_lock:
+        if _active is None:
+            _active = _open_index(signature)
+            return _active
+        if _rebuild_thread is None or not _rebuild_thread.is_alive():
+            _rebuild_thread = threading.Thread(target=_rebuild, args=(signature,), name="index-rebuild", daemon=True)
+            _rebuild_thread.start()
+        return _active
+
+# --- Search backends ---
+def _top_k(scores, k):
+    """Partial top-k: O(N) selection followed by sorting only the k winners."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
 
-    df = df.rename(columns={first_column_name: 'question'})
-    question_embeddings = _model.encode(df['question'].tolist(), convert_to_tensor=True)
-    return df, question_embeddings
+class ExactIndex:
+    """Brute-force inner product over the pre-normalized embedding matrix."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def search(self, query_vec, k=1):
+        """Returns (row indices, cosine scores) of the k best rows, best first."""
+        scores = self.embeddings @ np.asarray(query_vec, dtype=np.float32)
+        return _top_k(scores, k)
+
+    def search_batch(self, query_vecs, chunk_size=16384):
+        """
+        Best row and score for each row of a (B, dim) query matrix. Scores
+        one row chunk of the matrix against all queries per multiply, so
+        the score block stays chunk_size x B however large the index is.
+        """
+        query_vecs = np.asarray(query_vecs, dtype=np.float32)
+        best = np.zeros(len(query_vecs), dtype=np.int64)
+        best_scores = np.full(len(query_vecs), -np.inf, dtype=np.float32)
+        cols = np.arange(len(query_vecs))
+        for start in range(0, self.embeddings.shape[0], chunk_size):
+            scores = np.asarray(self.embeddings[start:start + chunk_size]) @ query_vecs.T
+            rows = scores.argmax(axis=0)
+            chunk_best = scores[rows, cols]
+            better = chunk_best > best_scores
+            best[better] = rows[better] + start
+            best_scores[better] = chunk_best[better]
+        return best, best_scores
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are clustered with spherical k-means and a query
+    only scans the rows of its n_probe closest clusters. Pure NumPy.
+    """
+
+    def __init__(self, embeddings, n_lists=None, n_probe=8, iterations=10, seed=0, chunk_size=65536):
+        self.embeddings = embeddings
+        self.n_probe = n_probe
+        n_rows = embeddings.shape[0]
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n_rows)))
+        n_lists = min(n_lists, n_rows)
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(n_rows, n_lists * 256)
+        sample = np.asarray(embeddings[rng.choice(n_rows, sample_size, replace=False)], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = (sample @ centroids.T).argmax(axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self.centroids = centroids
+
+        # Assign every row in chunks so the score matrix stays bounded.
+        assign = np.empty(n_rows, dtype=np.int32)
+        for start in range(0, n_rows, chunk_size):
+            block = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+            assign[start:start + chunk_size] = (block @ centroids.T).argmax(axis=1)
+        order = np.argsort(assign, kind='stable')
+        bounds = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(n_lists)]
+
+    def search(self, query_vec, k=1):
+        """Returns (row indices, cosine scores) of the k best rows found in the probed lists."""
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        probe, _ = _top_k(self.centroids @ query_vec, self.n_probe)
+        candidates = np.concatenate([self.lists[c] for c in probe])
+        if candidates.size == 0:
+            return _top_k(np.empty(0, dtype=np.float32), k)
+        candidates.sort()
+        scores = np.asarray(self.embeddings[candidates]) @ query_vec
+        top, top_scores = _top_k(scores, k)
+        return candidates[top], top_scores
+
+class CompactIndex:
+    """
+    Brute-force search over a float16 or int8 (per-row scaled) copy of the
+    embedding matrix. The best rescore candidates are re-scored against the
+    float32 rows, so returned scores are exact; only rows that the compact
+    scan ranks below the candidate cut-off can be missed.
+    """
+
+    def __init__(self, embeddings, dtype="float16", rescore=RESCORE_CANDIDATES, chunk_size=16384):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unknown compact dtype '{dtype}'. Use 'float16' or 'int8'.")
+        self.embeddings = embeddings
+        self.dtype = dtype
+        self.rescore = rescore
+        self.chunk_size = chunk_size
+        n_rows, dim = embeddings.shape
+        self.compact = np.empty((n_rows, dim), dtype=np.float16 if dtype == "float16" else np.int8)
+        self.scales = np.ones(n_rows, dtype=np.float32) if dtype == "int8" else None
+        for start in range(0, n_rows, chunk_size):
+            block = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+            if self.scales is None:
+                self.compact[start:start + chunk_size] = block
+            else:
+                scale = np.abs(block).max(axis=1) / 127.0
+                scale[scale == 0] = 1.0
+                self.scales[start:start + chunk_size] = scale
+                self.compact[start:start + chunk_size] = np.rint(block / scale[:, None])
+
+    def approximate_scores(self, query_vec):
+        """Inner products against the compact matrix, dequantized chunk by chunk."""
+        scores = np.empty(self.compact.shape[0], dtype=np.float32)
+        for start in range(0, self.compact.shape[0], self.chunk_size):
+            block = self.compact[start:start + self.chunk_size].astype(np.float32)
+            scores[start:start + self.chunk_size] = block @ query_vec
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def search(self, query_vec, k=1):
+        """Returns (row indices, exact cosine scores) of the k best rows, best first."""
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        candidates, _ = _top_k(self.approximate_scores(query_vec), max(k, self.rescore))
+        candidates.sort()
+        scores = np.asarray(self.embeddings[candidates]) @ query_vec
+        top, top_scores = _top_k(scores, k)
+        return candidates[top], top_scores
+
+class HybridIndex:
+    """
+    BM25 prefilter over the question texts followed by an exact cosine
+    re-rank of the lexical candidates. Queries that share no term with the
+    questions (Hindi against an English dataset, for one) or whose best
+    candidate scores below min_score go to the dense index instead, so the
+    multilingual model still answers them.
+    """
+
+    def __init__(self, embeddings, questions, dense, candidates=LEXICAL_CANDIDATES, min_score=SIMILARITY_THRESHOLD):
+        self.embeddings = embeddings
+        self.dense = dense
+        self.lexical = BM25Index(questions)
+        self.candidates = candidates
+        self.min_score = min_score
+
+    def search(self, query_vec, k=1):
+        """Dense search only, for callers without the query text."""
+        return self.dense.search(query_vec, k)
+
+    def search_text(self, query, query_vec, k=1):
+        """Returns (row indices, cosine scores) of the k best rows, best first."""
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        rows, _ = self.lexical.top(query, self.candidates)
+        if len(rows):
+            rows.sort()
+            top, scores = _top_k(np.asarray(self.embeddings[rows]) @ query_vec, k)
+            if len(top) and scores[0] >= self.min_score:
+                metrics.inc("search.lexical.prefiltered")
+                return rows[top], scores
+        metrics.inc("search.lexical.fallback")
+        return self.dense.search(query_vec, k)
+
+def build_search_index(embeddings, backend=None, dtype=None, questions=None, lexical=None):
+    backend = backend or INDEX_BACKEND
+    dtype = dtype or INDEX_DTYPE
+    lexical = LEXICAL_PREFILTER if lexical is None else lexical
+    if backend == "ivf":
+        dense = IVFIndex(embeddings)
+    elif backend != "exact":
+        raise ValueError(f"Unknown index backend '{backend}'. Use 'exact' or 'ivf'.")
+    elif dtype != "float32":
+        dense = CompactIndex(embeddings, dtype)
+    else:
+        dense = ExactIndex(embeddings)
+    if lexical and questions is not None:
+        return HybridIndex(embeddings, questions, dense)
+    return dense
+
+def evaluate_index(index, reference, queries, k=10):
+    """
+    Measures an index against a reference (normally ExactIndex) over a matrix
+    of normalized query vectors. Reports recall@k and per-query latency in ms.
+    """
+    hits, latencies, ref_latencies = 0, [], []
+    for query_vec in queries:
+        start = time.perf_counter()
+        found, _ = index.search(query_vec, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        expected, _ = reference.search(query_vec, k)
+        ref_latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(found.tolist()) & set(expected.tolist()))
+    total = max(1, len(queries) * min(k, reference.embeddings.shape[0]))
+    return {
+        "recall_at_k": hits / total,
+        "k": k,
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "reference_latency_ms_p50": float(np.percentile(ref_latencies, 50)),
+        "reference_latency_ms_p95": float(np.percentile(ref_latencies, 95)),
+    }
+
+@metrics.timed("model.encode")
+def encode_texts(texts):
+    """L2-normalized float32 embeddings for a list of texts."""
+    client = get_client()
+    if client is not None:
+        try:
+            return np.asarray(client.encode(texts), dtype=np.float32)
+        except InferenceUnavailable as e:
+            mark_unavailable(e)
+    model = load_semantic_model()
+    return model.encode(texts, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+
+def encode_query(query):
+    """L2-normalized float32 embedding of a single query."""
+    return encode_texts([query])[0]
+
+def current_index_key():
+    """Key of the embedding index currently served, or None if the dataset is unavailable."""
+    client = get_client()
+    if client is not None:
+        try:
+            return client.index_key()
+        except InferenceUnavailable as e:
+            mark_unavailable(e)
+    return get_dataset_index().key
+
+def _remote_best_match(client, query, query_embedding):
+    with metrics.stage("search.remote"):
+        rows, scores = client.search(query_embedding, 1, text=query)
+    if not rows:
+        return None, 0
+    best_score = scores[0]
+    if best_score < SIMILARITY_THRESHOLD:
+        return None, best_score
+    return pd.Series(rows[0]), best_score
 
 # --- find_best_match function ---
-def find_best_match(query):
+def find_best_matches(query_embeddings, queries=None):
+    """
+    Batched find_best_match for a (B, dim) matrix of normalized query
+    embeddings, always searched in-process. The exact backend scores the
+    whole batch with one matrix multiply per row chunk; other backends
+    search query by query, and the lexical prefilter needs the query texts
+    in queries to rank like find_best_match. Returns a list of (row or None, score).
+    """
+    index = get_dataset_index()
+    if index.df is None or index.embeddings is None or index.df.empty:
+        return [(None, 0)] * len(query_embeddings)
+    if hasattr(index.search, "search_batch"):
+        best, scores = index.search.search_batch(query_embeddings)
+    else:
+        if hasattr(index.search, "search_text"):
+            if queries is None:
+                raise ValueError("The lexical prefilter needs the query texts.")
+            found = [index.search.search_text(text, q, 1) for text, q in zip(queries, query_embeddings)]
+        else:
+            found = [index.search.search(q, 1) for q in query_embeddings]
+        best = [int(i[0]) for i, _ in found]
+        scores = [float(s[0]) for _, s in found]
+    return [
+        (index.df.iloc[int(i)], float(score)) if score >= SIMILARITY_THRESHOLD else (None, float(score))
+        for i, score in zip(best, scores)
+    ]
+
+def find_best_match(query, query_embedding=None):
     """
     Finds the most relevant entry in the dataset for a user's query.
-    Loads models and data only when called.
+    Loads models and data only when called. Pass query_embedding to reuse
+    an embedding the caller already computed with encode_query.
     """
+    if query_embedding is None:
+        query_embedding = encode_query(query)
+
+    # In client mode the shared inference server owns the embedding matrix.
+    client = get_client()
+    if client is not None:
+        try:
+            return _remote_best_match(client, query, query_embedding)
+        except InferenceUnavailable as e:
+            mark_unavailable(e)
+
     # --- Load model and data INSIDE the function ---
-    model = load_semantic_model()
-    dataset, embeddings = load_and_embed_dataset(model)
+    index = get_dataset_index()
+    dataset = index.df
 
-    if dataset is None or embeddings is None:
+    if dataset is None or index.embeddings is None:
         return None, 0
 
-    query_embedding = model.encode(query, convert_to_tensor=True)
-    cosine_scores = util.cos_sim(query_embedding, embeddings)
-    
-    best_match_index = cosine_scores.argmax().item()
-    best_score = cosine_scores[0][best_match_index].item()
-    
-    if best_score < 0.5: # Similarity threshold
+    # Both sides are L2-normalized, so the inner product is the cosine similarity.
+    with metrics.stage("search.similarity"):
+        if hasattr(index.search, "search_text"):
+            indices, scores = index.search.search_text(query, query_embedding, 1)
+        else:
+            indices, scores = index.search.search(query_embedding, 1)
+    if len(indices) == 0:
+        return None, 0
+
+    best_match_index = int(indices[0])
+    best_score = float(scores[0])
+
+    if best_score < SIMILARITY_THRESHOLD:
         return None, best_score
-        
+
     best_match_row = dataset.iloc[best_match_index]
-    return best_match_row, best_score
\ No newline at end of file
+    return best_match_row, best_score
+
+if __name__ == "__main__":
+    # Build step: python semantic_engine.py
+    frame = load_dataset()
+    if frame is not None:
+        info = build_embedding_index(load_semantic_model(), frame, index_key(dataset_hash()),
+                                     previous_key=_read_latest())
+        print(f"Wrote index {info['key']} ({info['rows']} x {info['dim']}, "
+              f"{info['encoded']} encoded, {info['reused']} reused) to {INDEX_DIR}/")
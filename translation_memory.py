@@ -0,0 +1,115 @@
+import re
+import hashlib
+import threading
+import metrics
+from db_functions import get_translations, save_translations
+
+# Paragraph breaks, and sentence ends followed by what looks like a new sentence
+# (so "e.g. rest" or "10-15 min. of" stay in one piece). Groups keep the
+# separators so the translation is reassembled with the original whitespace.
+_PARAGRAPH_RE = re.compile(r"(\n[ \t]*\n\s*)")
+_SENTENCE_RE = re.compile(r"(?<=[.!?\u0964])(\s+)(?=[A-Z0-9\"'*(\u0900-\u097F])")
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def split_segments(text, pattern):
+    """Returns (pieces, separators); joining them alternately gives back text."""
+    parts = pattern.split(text)
+    return parts[0::2], parts[1::2]
+
+def join_segments(pieces, separators):
+    out = [pieces[0]]
+    for separator, piece in zip(separators, pieces[1:]):
+        out += [separator, piece]
+    return "".join(out)
+
+class TranslationMemory:
+    """
+    Persistent segment-level memory in front of an MT function, stored in
+    the translations table. A text is looked up whole, then by paragraph,
+    then by sentence; only sentences never seen before go to
+    translate_many(texts), in a single call for all texts passed together,
+    and the result is reassembled in order with the original whitespace.
+    Boilerplate such as the source line and the disclaimer is therefore
+    translated once, and no single generate input is longer than a sentence.
+    reference maps English segments to curated translations that take
+    precedence over the model (CONFIG's *_hi replies).
+    """
+
+    def __init__(self, model_version, translate_many, reference=None):
+        self.model_version = model_version
+        self.translate_many = translate_many
+        self.reference = dict(reference or {})
+        self._seeded = not self.reference
+        self._lock = threading.Lock()
+        self.stats = {"texts": 0, "text_hits": 0, "segments": 0, "segment_hits": 0,
+                      "segments_translated": 0, "chars_requested": 0, "chars_translated": 0}
+
+    def _seed(self):
+        if self._seeded:
+            return
+        save_translations([(text_hash(en), self.model_version, en, hi) for en, hi in self.reference.items()])
+        self._seeded = True
+
+    def _lookup(self, texts):
+        """{text: stored translation} for the texts already in memory."""
+        hashes = {text: text_hash(text) for text in texts}
+        found = get_translations(set(hashes.values()), self.model_version)
+        return {text: found[h] for text, h in hashes.items() if h in found}
+
+    def translate(self, text):
+        return self.translate_texts([text])[0]
+
+    def translate_texts(self, texts):
+        """Translations of texts, in order, translating only novel sentences."""
+        self._seed()
+        known = self._lookup(texts)
+        pending = [text for text in dict.fromkeys(texts) if text not in known]
+
+        # Paragraphs of the texts not stored whole, then sentences of the paragraphs not stored either.
+        layouts = {text: split_segments(text, _PARAGRAPH_RE) for text in pending}
+        paragraphs = {p for pieces, _ in layouts.values() for p in pieces if p.strip()}
+        known.update(self._lookup(paragraphs))
+        sentence_layouts = {p: split_segments(p, _SENTENCE_RE) for p in paragraphs if p not in known}
+        sentences = {s for pieces, _ in sentence_layouts.values() for s in pieces if s.strip()}
+        known.update(self._lookup(sentences))
+
+        novel = [s for s in sentences if s not in known]
+        rows = []
+        if novel:
+            known.update(zip(novel, self.translate_many(novel)))
+            rows += [(text_hash(s), self.model_version, s, known[s]) for s in novel]
+
+        for paragraph, (pieces, separators) in sentence_layouts.items():
+            known[paragraph] = join_segments([known[s] if s.strip() else s for s in pieces], separators)
+        for text, (pieces, separators) in layouts.items():
+            known[text] = join_segments([known[p] if p.strip() else p for p in pieces], separators)
+            rows.append((text_hash(text), self.model_version, text, known[text]))
+        if rows:
+            save_translations(rows)
+
+        segment_count = len(paragraphs) - len(sentence_layouts) + len(sentences)
+        text_hits = len(texts) - sum(text in layouts for text in texts)
+        with self._lock:
+            self.stats["texts"] += len(texts)
+            self.stats["text_hits"] += text_hits
+            self.stats["segments"] += segment_count
+            self.stats["segment_hits"] += segment_count - len(novel)
+            self.stats["segments_translated"] += len(novel)
+            self.stats["chars_requested"] += sum(len(text) for text in pending)
+            self.stats["chars_translated"] += sum(len(s) for s in novel)
+        metrics.inc("translate.tm.text_hits", text_hits)
+        metrics.inc("translate.tm.segment_hits", segment_count - len(novel))
+        metrics.inc("translate.tm.segments_translated", len(novel))
+        return [known[text] for text in texts]
+
+    def report(self):
+        """Hit rates and the share of characters that still went through the model."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["text_hit_rate"] = stats["text_hits"] / stats["texts"] if stats["texts"] else 0.0
+        stats["segment_hit_rate"] = stats["segment_hits"] / stats["segments"] if stats["segments"] else 0.0
+        stats["translated_char_fraction"] = (stats["chars_translated"] / stats["chars_requested"]
+                                             if stats["chars_requested"] else 0.0)
+        return stats